@@ -1,18 +1,63 @@
+import argparse
+import os
+import threading
 import dash
 from dash import html
 from dash_app.create_main_div import create_main_div
 from dash_app.create_result_div import create_result_div
 from dash_app.create_callback import create_callback
+from dash_app.metrics import register_metrics_route
+from dash_app.profiles import register_profile_routes
+from dash_app.downloads import register_download_routes
+from dash_app.ticker_search import get_search_index
+from portfolio_optimizer.instrumentation import stage_timer
 
-app=dash.Dash(title='Portfolio Optimizer',
-              meta_tags=[{'name': 'viewport', 'content': 'width=device-width, initial-scale=1.0'}],
-              )
 
+def create_app():
+    """
+    Create the Dash app with its layout, callbacks and extra routes, without serving it.
+    The time it takes is recorded as the 'startup' stage of the metrics.
 
+    Returns:
+        dash.Dash: The Dash app instance.
 
-app.layout=html.Div([create_main_div(),create_result_div()])
+    """
+    with stage_timer('startup'):
+        app=dash.Dash(title='Portfolio Optimizer',
+                      # Found from any working directory, e.g. under gunicorn
+                      assets_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets'),
+                      meta_tags=[{'name': 'viewport', 'content': 'width=device-width, initial-scale=1.0'}],
+                      )
 
+        app.layout=html.Div([create_main_div(),create_result_div()])
 
-create_callback(app)
+        create_callback(app)
+        register_metrics_route(app.server)
+        register_profile_routes(app.server)
+        register_download_routes(app.server)
 
-app.run_server(threaded=True)
+    # Build the ticker search index in the background, so the first search does not wait for it
+    threading.Thread(target=get_search_index, daemon=True).start()
+
+    return app
+
+
+app=create_app()
+
+# WSGI entry point, e.g. gunicorn --workers 4 app:server
+server=app.server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the Portfolio Optimizer server.')
+    parser.add_argument('--host', default=os.environ.get('HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8050)))
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes, they share the disk cache (default: 1, threaded)')
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Forking server, each worker serves one request at a time
+        app.run_server(host=args.host, port=args.port, threaded=False, processes=args.workers)
+    else:
+        app.run_server(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,165 @@
+// Risk-free rate of the efficient frontier figures, applied in the browser.
+//
+// The portfolios' volatilities and returns are already in the figures, so changing the
+// rate only recomputes the Sharpe ratios, the colors of the random portfolios (from the
+// best portfolio of each cell for the density heatmap), the maximum Sharpe ratio point
+// (looked up in the tangency table computed by the server) and the capital market line,
+// without a request to the server.
+
+(function () {
+    var TYPED_ARRAYS = {
+        f8: Float64Array, f4: Float32Array,
+        i4: Int32Array, i2: Int16Array, i1: Int8Array,
+        u4: Uint32Array, u2: Uint16Array, u1: Uint8Array
+    };
+
+    // Plain array of a trace property, decoding the base64 arrays of recent plotly versions
+    function values(array) {
+        if (array === undefined || array === null) {
+            return [];
+        }
+        if (!array.bdata) {
+            return Array.from(array);
+        }
+        var binary = atob(array.bdata);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        var flat = Array.from(new TYPED_ARRAYS[array.dtype](bytes.buffer));
+        return array.shape ? reshape(flat, String(array.shape).split(',').map(Number)) : flat;
+    }
+
+    // Nested arrays of a flat row-major array
+    function reshape(flat, shape) {
+        if (shape.length < 2) {
+            return flat;
+        }
+        var size = flat.length / shape[0];
+        var rows = [];
+        for (var start = 0; start < flat.length; start += size) {
+            rows.push(reshape(flat.slice(start, start + size), shape.slice(1)));
+        }
+        return rows;
+    }
+
+    function isMissing(value) {
+        return value === null || value === undefined || Number.isNaN(value);
+    }
+
+    function sharpe(portfolioReturn, std, rate) {
+        return (portfolioReturn - rate) / std;
+    }
+
+    // Annualized rate in decimal units, as the returns of the figures
+    function annualRate(rate, unit, period) {
+        var annual = Number(rate) || 0;
+        if (unit === 'percent') {
+            annual = annual / 100;
+        }
+        if (period === 'daily') {
+            annual = annual * 252;
+        }
+        return annual;
+    }
+
+    // Rate limited to the range of the tangency table, whose portfolios are not known outside of it
+    function clipRate(rate, tangency) {
+        if (!tangency || !tangency.Rate.length) {
+            return rate;
+        }
+        return Math.min(Math.max(rate, tangency.Rate[0]), tangency.Rate[tangency.Rate.length - 1]);
+    }
+
+    function percent(rate) {
+        return (rate * 100).toFixed(2) + '%';
+    }
+
+    // Tangency portfolio of the closest rate of the table
+    function tangencyPortfolio(tangency, rate) {
+        var best = 0;
+        for (var i = 1; i < tangency.Rate.length; i++) {
+            if (Math.abs(tangency.Rate[i] - rate) < Math.abs(tangency.Rate[best] - rate)) {
+                best = i;
+            }
+        }
+        return {std: tangency.Std[best], return: tangency.Return[best]};
+    }
+
+    function applyRate(figure, rate, tangency) {
+        if (!figure || !figure.data || !figure.data.length) {
+            return window.dash_clientside.no_update;
+        }
+
+        var maxStd = 0;
+        var data = figure.data.filter(function (trace) {
+            return trace.name !== 'Capital Market Line';
+        }).map(function (trace) {
+            var x = values(trace.x);
+            var y = values(trace.y);
+            var updated = Object.assign({}, trace);
+
+            if (trace.name === 'Efficient Frontier') {
+                maxStd = Math.max.apply(null, [maxStd].concat(x));
+                updated.text = x.map(function (std, i) { return sharpe(y[i], std, rate); });
+            } else if (trace.name === 'Portfolios' && trace.type === 'heatmap') {
+                // The customdata of a cell holds its number of portfolios, then the volatility
+                // and return of its best portfolio, whose Sharpe ratio is recomputed
+                var cells = values(trace.customdata);
+                updated.z = values(trace.z).map(function (row, i) {
+                    return row.map(function (value, j) {
+                        var cell = cells[i] && cells[i][j];
+                        if (isMissing(value) || !Array.isArray(cell) || isMissing(cell[1])) {
+                            return isMissing(value) ? null : value;
+                        }
+                        return sharpe(cell[2], cell[1], rate);
+                    });
+                });
+            } else if (trace.name === 'Portfolios') {
+                var ratios = x.map(function (std, i) { return sharpe(y[i], std, rate); });
+                updated.text = ratios;
+                updated.marker = Object.assign({}, trace.marker, {color: ratios});
+            } else if (trace.name === 'Stocks') {
+                updated.customdata = x.map(function (std, i) { return sharpe(y[i], std, rate); });
+            } else if (trace.name === 'Maximum Sharpe Ratio' && tangency) {
+                var point = tangencyPortfolio(tangency, rate);
+                updated.x = [point.std];
+                updated.y = [point.return];
+                updated.text = [sharpe(point.return, point.std, rate)];
+            }
+            return updated;
+        });
+
+        if (tangency) {
+            var point = tangencyPortfolio(tangency, rate);
+            var slope = sharpe(point.return, point.std, rate);
+            var end = Math.max(maxStd, point.std);
+            data.push({
+                type: 'scatter',
+                name: 'Capital Market Line',
+                mode: 'lines',
+                x: [0, end],
+                y: [rate, rate + slope * end],
+                line: {color: 'gray', dash: 'dash'},
+                hoverinfo: 'skip'
+            });
+        }
+
+        return Object.assign({}, figure, {data: data});
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        portfolio: {
+            applyRiskFreeRate: function (rate, unit, period, signatures, tangency, frontierFigure, stocksFigure) {
+                var annual = annualRate(rate, unit, period);
+                var clipped = clipRate(annual, tangency);
+                var note = '';
+                if (clipped !== annual) {
+                    note = 'The annual rate ' + percent(annual) + ' is outside of ' + percent(tangency.Rate[0]) +
+                        ' - ' + percent(tangency.Rate[tangency.Rate.length - 1]) + ', ' + percent(clipped) + ' is used.';
+                }
+                return [applyRate(frontierFigure, clipped, tangency), applyRate(stocksFigure, clipped, tangency), note];
+            }
+        }
+    });
+})();
@@ -0,0 +1,84 @@
+"""
+Benchmark of the scenario CVaR linear program as scenarios and assets grow.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_cvar
+    python -m benchmarks.bench_cvar --scenarios 1000 10000 --assets 10 100 --output cvar.json
+"""
+import argparse
+import json
+import time
+from portfolio_optimizer.cvar_optimization import (
+    get_minimum_cvar, get_max_return_for_target_cvar, build_cvar_program, get_scenario_matrix
+)
+from portfolio_optimizer.data_fetching import get_daily_returns
+from portfolio_optimizer.synthetic_data import synthetic_prices, synthetic_tickers
+
+
+
+def synthetic_scenarios(number_of_scenarios, number_of_assets):
+    """
+    Daily return scenarios of synthetic prices, shape (number_of_scenarios, number_of_assets).
+    """
+    df = synthetic_prices(synthetic_tickers(number_of_assets), number_of_days=number_of_scenarios + 1)
+    return get_scenario_matrix(get_daily_returns(df))
+
+
+def run(scenario_counts, asset_counts, beta=0.95):
+    """
+    Time the minimum-CVaR and the CVaR-constrained solves on every grid point.
+
+    Returns:
+    ---------------------
+    results : list
+        One dict per (scenarios, assets) pair.
+    """
+    results = []
+    for number_of_scenarios in scenario_counts:
+        for number_of_assets in asset_counts:
+            scenarios = synthetic_scenarios(number_of_scenarios, number_of_assets)
+
+            start = time.perf_counter()
+            cvar_program = build_cvar_program(scenarios, beta)
+            build_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            min_cvar, _ = get_minimum_cvar(scenarios, beta)
+            min_cvar_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            get_max_return_for_target_cvar(scenarios, 1.5 * min_cvar, beta, cvar_program)
+            target_cvar_time = time.perf_counter() - start
+
+            result = {
+                'scenarios': number_of_scenarios,
+                'assets': number_of_assets,
+                'non_zeros': int(cvar_program[1].nnz),
+                'build_seconds': build_time,
+                'min_cvar_seconds': min_cvar_time,
+                'target_cvar_seconds': target_cvar_time,
+            }
+            results.append(result)
+            print('{scenarios:>7} scenarios {assets:>5} assets  build {build_seconds:8.3f}s  '
+                  'min CVaR {min_cvar_seconds:8.3f}s  target CVaR {target_cvar_seconds:8.3f}s'.format(**result))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', type=int, nargs='+', default=[500, 2000, 10000, 30000])
+    parser.add_argument('--assets', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--beta', type=float, default=0.95)
+    parser.add_argument('--output', help='save the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.scenarios, args.assets, args.beta)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
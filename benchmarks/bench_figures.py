@@ -0,0 +1,119 @@
+"""
+Figure building and serialization of the plotly figures against the dict figures of fast_figures.
+
+For every figure of the app it reports the median build seconds, the median JSON
+serialization seconds and the payload size of both versions, on synthetic prices.
+
+    python -m benchmarks.bench_figures
+    python -m benchmarks.bench_figures --stocks 10 100 --repeat 10 --output figures.json
+"""
+import argparse
+import json
+import statistics
+import time
+import plotly.io as pio
+from portfolio_optimizer import data_visulization, fast_figures
+from portfolio_optimizer.correlation_clustering import cluster_order
+from portfolio_optimizer.data_fetching import get_statistical_summary
+from portfolio_optimizer.efficient_frontier import create_efficient_frontier, generate_random_portfolios
+from portfolio_optimizer.portfolio_density import create_portfolio_density
+from portfolio_optimizer.synthetic_data import synthetic_prices, synthetic_tickers
+
+
+LINE_CHART_MAX_POINTS = 1500
+
+
+
+def figure_arguments(number_of_stocks, number_of_random_portfolios):
+    """
+    Arguments of every figure function for a synthetic basket, keyed by figure name.
+    """
+    stock_list = synthetic_tickers(number_of_stocks)
+    df = synthetic_prices(stock_list)
+    mean_return, cov, corr, std, annualized_return, annualized_risk = get_statistical_summary(df)
+    frontier = create_efficient_frontier(stock_list, mean_return, cov, number_of_portfolios=20)
+    random_portfolios = generate_random_portfolios(frontier.columns, number_of_random_portfolios, stock_list,
+                                                   mean_return, cov)
+
+    best, least = frontier['Sharpe Ratio'].idxmax(), frontier['Std'].idxmin()
+    points = (frontier['Return'][best], frontier['Std'][best], frontier['Sharpe Ratio'][best],
+              frontier['Return'][least], frontier['Std'][least], frontier['Sharpe Ratio'][least],
+              frontier['Return'], frontier['Std'], frontier['Sharpe Ratio'])
+    cloud = (random_portfolios['Return'], random_portfolios['Std'], random_portfolios['Sharpe Ratio'])
+
+    return {
+        'stocks_line_chart': ((df, LINE_CHART_MAX_POINTS), {}),
+        'correlation_matrix': ((corr,), {}),
+        'correlation_matrix_clustered': ((corr,), {}),
+        'efficient_frontier': (points + cloud, {}),
+        'efficient_frontier_density': (points + cloud, {'density': create_portfolio_density(mean_return, cov, 100000)}),
+        'stocks_vs_portfolio': (points + (annualized_return, annualized_risk), {}),
+    }
+
+
+FIGURES = {
+    'stocks_line_chart': (data_visulization.plot_stocks_line_chart, fast_figures.fast_stocks_line_chart),
+    'correlation_matrix': (data_visulization.plot_correlation_matrix, fast_figures.fast_correlation_matrix),
+    # Clustering included, as in the app for large baskets
+    'correlation_matrix_clustered': (data_visulization.plot_correlation_matrix,
+                                     lambda corr: fast_figures.fast_clustered_correlation_matrix(corr, cluster_order(corr))),
+    'efficient_frontier': (data_visulization.efficient_frontier_with_details,
+                           fast_figures.fast_efficient_frontier_with_details),
+    'efficient_frontier_density': (data_visulization.efficient_frontier_with_details,
+                                   fast_figures.fast_efficient_frontier_with_details),
+    'stocks_vs_portfolio': (data_visulization.plot_stocks_vs_portfolio, fast_figures.fast_stocks_vs_portfolio),
+}
+
+
+def measure(build, serialize, args, kwargs, repeat):
+    """
+    Median build and serialization seconds, and the payload bytes of one figure function.
+    """
+    build_times, json_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        figure = build(*args, **kwargs)
+        build_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        payload = serialize(figure)
+        json_times.append(time.perf_counter() - start)
+
+    return statistics.median(build_times), statistics.median(json_times), len(payload)
+
+
+def run(stock_counts, number_of_random_portfolios, repeat):
+    results = []
+    for number_of_stocks in stock_counts:
+        arguments = figure_arguments(number_of_stocks, number_of_random_portfolios)
+        for name, (plotly_function, fast_function) in FIGURES.items():
+            args, kwargs = arguments[name]
+            result = {'figure': name, 'stocks': number_of_stocks}
+            (result['plotly_build_seconds'], result['plotly_json_seconds'],
+             result['plotly_bytes']) = measure(plotly_function, pio.to_json, args, kwargs, repeat)
+            (result['fast_build_seconds'], result['fast_json_seconds'],
+             result['fast_bytes']) = measure(fast_function, fast_figures.figure_to_json, args, kwargs, repeat)
+            results.append(result)
+            print('{figure:<28} {stocks:>4} stocks  build {plotly_build_seconds:8.4f}s -> {fast_build_seconds:8.4f}s  '
+                  'json {plotly_json_seconds:8.4f}s -> {fast_json_seconds:8.4f}s  '
+                  'bytes {plotly_bytes:>9} -> {fast_bytes:>9}'.format(**result))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stocks', type=int, nargs='+', default=[5, 20, 100, 300])
+    parser.add_argument('--random-portfolios', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='save the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.stocks, args.random_portfolios, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
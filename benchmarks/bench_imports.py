@@ -0,0 +1,75 @@
+"""
+Import time of the library modules and of the app, each measured in a fresh interpreter.
+
+For every module it reports the median import time and which heavy dependencies the
+import pulled in, so an eager import of yfinance, scipy.optimize or plotly.express
+shows up as a regression.
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --repeat 10 --output imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'portfolio_optimizer.portfolio_optimization',
+    'portfolio_optimizer.data_fetching',
+    'portfolio_optimizer.efficient_frontier',
+    'portfolio_optimizer.pipeline',
+    'portfolio_optimizer.data_visulization',
+    'dash_app.create_callback',
+    'app',
+]
+HEAVY_DEPENDENCIES = ['pandas', 'scipy.optimize', 'yfinance', 'plotly.express', 'plotly.graph_objects', 'dash']
+
+MEASURE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+
+
+def measure_import(module, repeat):
+    """
+    Median import seconds of a module in fresh interpreters, and the heavy dependencies it loaded.
+    """
+    times, loaded = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', MEASURE.format(module=module, heavy=HEAVY_DEPENDENCIES)],
+                                cwd=REPOSITORY, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        loaded = result['loaded']
+    return {'module': module, 'seconds': statistics.median(times), 'loaded': loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--output', help='save the results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        results.append(result)
+        print('{:<44} {:8.3f}s  loads: {}'.format(module, result['seconds'], ', '.join(result['loaded']) or '-'))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory of the returns step with float64 and float32 storage, on synthetic prices.
+
+For every panel size it reports the bytes held at rest (the prices of the fetch stage
+and the returns of the returns stage) and the peak bytes allocated while computing the
+returns and the statistical summary from the stored prices, measured with tracemalloc.
+
+    python -m benchmarks.bench_returns_dtype
+    python -m benchmarks.bench_returns_dtype --days 5000 --stocks 100 500 --output returns_dtype.json
+"""
+import argparse
+import json
+import tracemalloc
+from portfolio_optimizer.data_fetching import get_daily_returns, get_statistical_summary
+from portfolio_optimizer.synthetic_data import synthetic_prices, synthetic_tickers
+
+
+DTYPES = ['float64', 'float32']
+
+
+
+def measure(downloaded_prices, dtype):
+    """
+    Resident and peak bytes of the fetch, returns and statistics steps for one storage dtype.
+    """
+    # As get_returns_df, the downloaded prices are converted once and stored in the dtype
+    prices = downloaded_prices.astype(dtype)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        returns = get_daily_returns(prices, dtype=None if dtype == 'float64' else dtype)
+        get_statistical_summary(prices, returns)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    resident = int(prices.memory_usage(index=False).sum() + returns.memory_usage(index=False).sum())
+    return resident, peak
+
+
+def run(number_of_days, stock_counts):
+    results = []
+    for number_of_stocks in stock_counts:
+        downloaded_prices = synthetic_prices(synthetic_tickers(number_of_stocks), number_of_days=number_of_days)
+        for dtype in DTYPES:
+            result = {'stocks': number_of_stocks, 'days': number_of_days, 'dtype': dtype}
+            result['resident_bytes'], result['peak_bytes'] = measure(downloaded_prices, dtype)
+            results.append(result)
+            print('{stocks:>5} stocks {days:>6} days  {dtype:<8} resident {resident_bytes:>12,} B  '
+                  'peak {peak_bytes:>12,} B'.format(**result))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--stocks', type=int, nargs='+', default=[50, 200, 500])
+    parser.add_argument('--output', help='save the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.days, args.stocks)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
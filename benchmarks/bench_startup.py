@@ -0,0 +1,85 @@
+"""
+Startup time of the app: ticker index loading, a fresh process building the app and
+a fresh process loading the ticker search index.
+
+The app builds the search index in a background thread once it is created, so the
+search index is timed in an interpreter that does not import app, with and without
+the compiled ticker index.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dash_app import ticker_index
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints the seconds spent importing app.py, which builds the app
+CREATE_APP = 'import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)'
+
+# Prints the seconds spent loading the ticker index and building the search index, without the app
+LOAD_SEARCH_INDEX = (
+    'import time; from dash_app.ticker_search import get_search_index; '
+    'start = time.perf_counter(); get_search_index(); print(time.perf_counter() - start)'
+)
+
+
+
+def time_in_process(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def time_fresh_process(script, repeat, compiled_index=True):
+    """
+    Median of the seconds printed by a script run in a fresh interpreter.
+    """
+    times = []
+    for _ in range(repeat):
+        if compiled_index:
+            if not os.path.exists(ticker_index.INDEX_FILE):
+                ticker_index.compile_ticker_index()
+        elif os.path.exists(ticker_index.INDEX_FILE):
+            os.remove(ticker_index.INDEX_FILE)
+        output = subprocess.run([sys.executable, '-c', script], cwd=REPOSITORY, check=True,
+                                capture_output=True, text=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='save the results as JSON')
+    args = parser.parse_args()
+
+    results = {
+        'read_excel_seconds': time_in_process(ticker_index.compile_ticker_index, args.repeat),
+        'read_compiled_index_seconds': time_in_process(
+            lambda: ticker_index._read_index(ticker_index.SOURCE_FILE, ticker_index.INDEX_FILE), args.repeat),
+    }
+    results['app_seconds'] = time_fresh_process(CREATE_APP, args.repeat)
+    results['search_index_seconds_without_index'] = time_fresh_process(LOAD_SEARCH_INDEX, args.repeat, False)
+    results['search_index_seconds_with_index'] = time_fresh_process(LOAD_SEARCH_INDEX, args.repeat, True)
+
+    for key, value in results.items():
+        print('{:<34} {:8.3f}s'.format(key, value))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
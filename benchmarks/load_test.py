@@ -0,0 +1,263 @@
+"""
+Concurrent-user load test of the Calculate button callback.
+
+Starts app.py with the offline synthetic price provider (PORTFOLIO_PRICE_PROVIDER=synthetic),
+replays Calculate requests with mixed basket sizes and date ranges at the given concurrency
+and reports the throughput and the p50/p95/p99 latencies. The request mix only depends on
+the seed, so runs with the same settings are comparable.
+
+    python -m benchmarks.load_test --concurrency 20 --requests 200 --output load.json
+    python -m benchmarks.load_test --concurrency 20 --requests 200 --compare load.json
+    python -m benchmarks.load_test --url http://127.0.0.1:8050 --concurrency 5
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TICKERS = [
+    'AAPL', 'MSFT', 'AMZN', 'NVDA', 'GOOGL', 'META', 'BRK.B', 'TSLA', 'UNH', 'XOM',
+    'JNJ', 'JPM', 'V', 'PG', 'MA', 'HD', 'CVX', 'MRK', 'ABBV', 'PEP',
+    'KO', 'AVGO', 'COST', 'WMT', 'MCD', 'CSCO', 'TMO', 'ACN', 'ABT', 'DHR',
+    'NEE', 'LIN', 'ADBE', 'TXN', 'PM', 'NKE', 'CRM', 'AMD', 'ORCL', 'HON',
+]
+BASKET_SIZES = [2, 3, 5, 10, 20]
+
+
+
+def start_app(port, workers=1, cache_dir=''):
+    """
+    Start app.py with the synthetic price provider and wait until it answers.
+
+    Parameters:
+    ---------------------
+    port : int
+        Port of the server.
+    workers : int, optional
+        Number of worker processes (default is 1).
+    cache_dir : str, optional
+        Shared cache directory, the cache is disabled when empty (default).
+
+    Returns:
+    ---------------------
+    process : subprocess.Popen
+        The server process.
+    """
+    environment = dict(os.environ, PORTFOLIO_PRICE_PROVIDER='synthetic', PORTFOLIO_CACHE_DIR=cache_dir)
+    process = subprocess.Popen([sys.executable, 'app.py', '--port', str(port), '--workers', str(workers)],
+                               cwd=REPOSITORY, env=environment,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('app.py exited with status {}'.format(process.returncode))
+        try:
+            urllib.request.urlopen('http://127.0.0.1:{}/'.format(port), timeout=1)
+            return process
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError('app.py did not start within 120 seconds')
+
+
+def find_calculate_callback(url):
+    """
+    Find the callback triggered by the Calculate button in the app dependencies.
+
+    Returns:
+    ---------------------
+    callback : dict
+        The callback specification from /_dash-dependencies.
+    """
+    with urllib.request.urlopen(url + '/_dash-dependencies') as response:
+        dependencies = json.load(response)
+
+    for callback in dependencies:
+        if {'id': 'Calculate Button', 'property': 'n_clicks'} in callback['inputs']:
+            return callback
+    raise RuntimeError('no callback is triggered by the Calculate button')
+
+
+def parse_outputs(output):
+    # '..id.property...id.property..' for multiple outputs, 'id.property' for one
+    if output.startswith('..'):
+        output = output[2:-2]
+    outputs = []
+    for part in output.split('...'):
+        component_id, component_property = part.rsplit('.', 1)
+        outputs.append({'id': component_id, 'property': component_property})
+    return outputs
+
+
+def generate_requests(number_of_requests, seed):
+    """
+    Generate the (basket, start date, end date) mix of the load test.
+    """
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(number_of_requests):
+        basket = rng.sample(TICKERS, rng.choice(BASKET_SIZES))
+        start = datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(0, 3 * 365))
+        end = start + datetime.timedelta(days=rng.choice([182, 365, 730, 1095]))
+        requests.append((basket, start.isoformat(), end.isoformat()))
+    return requests
+
+
+def build_payload(callback, n_clicks, basket, start_date, end_date):
+    """
+    Build the body of a Dash callback request for the Calculate button.
+    """
+    values = {
+        ('Stocks Dropdown', 'value'): basket,
+        ('Date Picker', 'start_date'): start_date,
+        ('Date Picker', 'end_date'): end_date,
+    }
+    return {
+        'output': callback['output'],
+        'outputs': parse_outputs(callback['output']),
+        'inputs': [{'id': 'Calculate Button', 'property': 'n_clicks', 'value': n_clicks}],
+        'state': [dict(state, value=values.get((state['id'], state['property']))) for state in callback['state']],
+        'changedPropIds': ['Calculate Button.n_clicks'],
+    }
+
+
+def send(url, payload):
+    """
+    Post one callback request.
+
+    Returns:
+    ---------------------
+    result : tuple
+        Latency in seconds, response size in bytes and error message (None on success).
+    """
+    body = json.dumps(payload).encode()
+    request = urllib.request.Request(url + '/_dash-update-component', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=600) as response:
+            size = len(response.read())
+        return time.perf_counter() - start, size, None
+    except Exception as exception:
+        return time.perf_counter() - start, 0, '{}: {}'.format(type(exception).__name__, exception)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float('nan')
+    # Nearest-rank percentile
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def run(url, concurrency, number_of_requests, seed, warmup):
+    """
+    Replay the requests at the given concurrency.
+
+    Returns:
+    ---------------------
+    summary : dict
+        Throughput, latency percentiles, response sizes and error count.
+    """
+    callback = find_calculate_callback(url)
+    requests = generate_requests(number_of_requests + warmup, seed)
+    payloads = [build_payload(callback, i + 1, *request) for i, request in enumerate(requests)]
+
+    for payload in payloads[:warmup]:
+        send(url, payload)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda payload: send(url, payload), payloads[warmup:]))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, error in results if error is None]
+    errors = [error for _, _, error in results if error is not None]
+
+    return {
+        'requests': number_of_requests,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'seconds': elapsed,
+        'throughput_per_second': len(latencies) / elapsed,
+        'p50_seconds': percentile(latencies, 50),
+        'p95_seconds': percentile(latencies, 95),
+        'p99_seconds': percentile(latencies, 99),
+        'mean_seconds': statistics.mean(latencies) if latencies else float('nan'),
+        'mean_response_bytes': statistics.mean(size for _, size, error in results if error is None) if latencies else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=20, help='simultaneous users (default: 20)')
+    parser.add_argument('--requests', type=int, default=100, help='measured requests (default: 100)')
+    parser.add_argument('--warmup', type=int, default=2, help='unmeasured requests sent first (default: 2)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the request mix (default: 0)')
+    parser.add_argument('--port', type=int, default=8060, help='port of the started app (default: 8060)')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes of the started app (default: 1)')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='enable the shared result cache of the started app (in a fresh directory)')
+    parser.add_argument('--url', help='test an already running app instead of starting one')
+    parser.add_argument('--output', help='save the settings and results as JSON')
+    parser.add_argument('--compare', help='previous JSON result to compare against')
+    args = parser.parse_args()
+
+    process = None
+    url = args.url.rstrip('/') if args.url else 'http://127.0.0.1:{}'.format(args.port)
+    try:
+        if args.url is None:
+            cache_dir = tempfile.mkdtemp(prefix='load_test_cache_') if args.with_cache else ''
+            process = start_app(args.port, args.workers, cache_dir)
+        summary = run(url, args.concurrency, args.requests, args.seed, args.warmup)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print('{requests} requests, {errors} errors in {seconds:.1f}s: {throughput_per_second:.2f} req/s, '
+          'p50 {p50_seconds:.3f}s, p95 {p95_seconds:.3f}s, p99 {p99_seconds:.3f}s'.format(**summary))
+    if summary['first_error']:
+        print('First error:', summary['first_error'])
+
+    report = {
+        'settings': {'concurrency': args.concurrency, 'requests': args.requests, 'warmup': args.warmup,
+                     'seed': args.seed, 'url': args.url, 'workers': args.workers, 'cache': args.with_cache},
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'summary': summary,
+    }
+
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+        if previous['settings'] != report['settings']:
+            print('Warning: the settings differ from the compared run', previous['settings'])
+        for key in ('throughput_per_second', 'p50_seconds', 'p95_seconds', 'p99_seconds'):
+            before, after = previous['summary'][key], summary[key]
+            print('{:<22} {:10.3f} -> {:10.3f} ({:+.1%})'.format(key, before, after, after / before - 1))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Benchmark suite of the optimizers and of the app pipeline on synthetic, offline data.
+
+Every stage is timed on a grid of asset counts (N) and history lengths (T). For each
+grid point the suite reports the median wall time, the peak traced memory and, for the
+stages that run SLSQP, the median number of solver calls, iterations and function
+evaluations of the timed runs.
+
+    python -m benchmarks.run_benchmarks --quick
+    python -m benchmarks.run_benchmarks --save benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --tolerance 0.25
+
+With --compare, every measurement slower than the baseline by more than the tolerance
+is flagged as a regression and the command exits with status 1.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import numpy as np
+import scipy.optimize as sc
+import portfolio_optimizer.pipeline as pipeline
+import portfolio_optimizer.pipeline_graph as pipeline_graph
+import portfolio_optimizer.shared_cache as shared_cache
+from portfolio_optimizer.data_fetching import get_statistical_summary
+from portfolio_optimizer.efficient_frontier import create_efficient_frontier, generate_random_portfolios
+from portfolio_optimizer.portfolio_optimization import (
+    get_max_sharp_ratio, get_minimum_variance, get_portfolio_performance,
+    get_weights_for_target_return, get_weights_for_target_variance
+)
+from portfolio_optimizer.synthetic_data import synthetic_prices, synthetic_tickers
+
+
+ASSETS = [5, 20, 100, 500]
+DAYS = [250, 1000, 5000]
+QUICK_ASSETS = [5, 20]
+QUICK_DAYS = [250, 1000]
+
+
+
+@contextlib.contextmanager
+def count_solver_calls():
+    """
+    Count the SLSQP calls, iterations and function evaluations made inside the block.
+    """
+    counts = {'solver_calls': 0, 'iterations': 0, 'function_evaluations': 0}
+    minimize = sc.minimize
+
+    def counting_minimize(*args, **kwargs):
+        results = minimize(*args, **kwargs)
+        counts['solver_calls'] += 1
+        counts['iterations'] += int(results.get('nit', 0))
+        counts['function_evaluations'] += int(results.get('nfev', 0))
+        return results
+
+    sc.minimize = counting_minimize
+    try:
+        yield counts
+    finally:
+        sc.minimize = minimize
+
+
+@contextlib.contextmanager
+def offline_prices(df):
+    """
+    Serve the given prices to the pipeline instead of downloading them.
+    """
+    get_returns_df = pipeline.get_returns_df
+    pipeline.get_returns_df = lambda tickers, start_date=None, end_date=None, dtype=None: (
+        df[tickers] if dtype is None else df[tickers].astype(dtype))
+    try:
+        yield
+    finally:
+        pipeline.get_returns_df = get_returns_df
+
+
+def capture_update_callback():
+    """
+    Register the app callbacks on a stand-in app and return the update function.
+    """
+    from dash_app.create_callback import create_callback
+
+    class CallbackRecorder:
+        def __init__(self):
+            self.callbacks = []
+
+        def callback(self, *args, **kwargs):
+            def register(function):
+                self.callbacks.append(function)
+                return function
+            return register
+
+        def clientside_callback(self, *args, **kwargs):
+            pass
+
+    recorder = CallbackRecorder()
+    create_callback(recorder)
+    return next(function for function in recorder.callbacks if function.__name__ == 'update')
+
+
+def measure(function, repeat):
+    """
+    Run a function ``repeat`` times and once more under tracemalloc.
+
+    Returns:
+    ---------------------
+    measurement : dict
+        Median seconds, peak memory in MB and the median solver counts of the timed runs.
+    """
+    times, run_counts = [], []
+    for _ in range(repeat):
+        with count_solver_calls() as counts:
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        run_counts.append(counts)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    measurement = {'seconds': statistics.median(times), 'peak_mb': peak / 2**20}
+    # Warm starts and caches can change the solver work between runs, so no single run is reported
+    for key in run_counts[0]:
+        measurement[key] = statistics.median(counts[key] for counts in run_counts)
+    return measurement
+
+
+def build_stages(df, frontier_points, random_points, with_figures):
+    """
+    Create the benchmarked stages for one price panel.
+
+    Returns:
+    ---------------------
+    stages : list
+        List of (stage name, function, uses the optimizers) tuples.
+    """
+    stock_list = df.columns.to_list()
+    mean_return, cov, corr, std, annualized_return, annualized_risk = get_statistical_summary(df)
+    _, min_variance_weights = get_minimum_variance(mean_return, cov)
+    min_risk_return, min_std = get_portfolio_performance(min_variance_weights, mean_return, cov)
+    target_return = (min_risk_return + mean_return.max() * 252) / 2
+
+    stages = [
+        ('get_statistical_summary', lambda: get_statistical_summary(df), False),
+        ('get_max_sharp_ratio', lambda: get_max_sharp_ratio(mean_return, cov), True),
+        ('get_minimum_variance', lambda: get_minimum_variance(mean_return, cov), True),
+        ('get_weights_for_target_return', lambda: get_weights_for_target_return(mean_return, cov, target_return), True),
+        ('get_weights_for_target_variance', lambda: get_weights_for_target_variance(mean_return, cov, 1.5 * min_std), True),
+        ('create_efficient_frontier',
+         lambda: create_efficient_frontier(stock_list, mean_return, cov, number_of_portfolios=frontier_points), True),
+        ('generate_random_portfolios',
+         lambda: generate_random_portfolios(stock_list + ['Return', 'Std', 'Sharpe Ratio'], random_points,
+                                            stock_list, mean_return, cov), False),
+    ]
+
+    if with_figures:
+        from portfolio_optimizer.data_visulization import (
+            plot_stocks_line_chart, plot_correlation_matrix, efficient_frontier_with_details, plot_stocks_vs_portfolio
+        )
+        frontier = create_efficient_frontier(stock_list, mean_return, cov, number_of_portfolios=frontier_points)
+        cloud = generate_random_portfolios(frontier.columns, random_points, stock_list, mean_return, cov)
+        max_sharpe_ratio, weights = get_max_sharp_ratio(mean_return, cov)
+        max_return, max_return_std = get_portfolio_performance(weights, mean_return, cov)
+        frontier_args = (max_return, max_return_std, max_sharpe_ratio, min_risk_return, min_std, min_risk_return/min_std,
+                         frontier['Return'], frontier['Std'], frontier['Sharpe Ratio'])
+
+        stages.extend([
+            ('plot_stocks_line_chart', lambda: plot_stocks_line_chart(df), False),
+            ('plot_correlation_matrix', lambda: plot_correlation_matrix(corr), False),
+            ('efficient_frontier_with_details',
+             lambda: efficient_frontier_with_details(*frontier_args, cloud['Return'], cloud['Std'], cloud['Sharpe Ratio']),
+             False),
+            ('plot_stocks_vs_portfolio',
+             lambda: plot_stocks_vs_portfolio(*frontier_args, annualized_return, annualized_risk), False),
+        ])
+
+        update = capture_update_callback()
+
+        def end_to_end():
+            # Measure a cold calculation, not the memoized pipeline stages
+            pipeline_graph.clear_stage_cache()
+            with offline_prices(df):
+                update(1, list(stock_list), None, None)
+
+        stages.append(('update_callback', end_to_end, True))
+
+    return stages
+
+
+def run(asset_counts, day_counts, repeat, frontier_points, random_points, max_optimizer_assets, with_figures):
+    """
+    Run every stage on every grid point.
+
+    Returns:
+    ---------------------
+    results : list
+        One dict per (stage, assets, days) measurement.
+    """
+    results = []
+    for number_of_assets in asset_counts:
+        for number_of_days in day_counts:
+            df = synthetic_prices(synthetic_tickers(number_of_assets), number_of_days=number_of_days)
+            for name, function, uses_optimizers in build_stages(df, frontier_points, random_points, with_figures):
+                result = {'stage': name, 'assets': number_of_assets, 'days': number_of_days}
+                if uses_optimizers and max_optimizer_assets is not None and number_of_assets > max_optimizer_assets:
+                    # Kept in the results, so a saved baseline shows what was not measured
+                    result['skipped'] = 'SLSQP stage above --max-optimizer-assets={}'.format(max_optimizer_assets)
+                    results.append(result)
+                    print('{stage:<34} N={assets:<4} T={days:<5} SKIPPED ({skipped})'.format(**result))
+                    continue
+
+                result.update(measure(function, repeat))
+                results.append(result)
+                print('{stage:<34} N={assets:<4} T={days:<5} {seconds:10.4f}s {peak_mb:9.1f} MB '
+                      '{solver_calls:>7g} solves {iterations:>7g} it {function_evaluations:>8g} fev'.format(**result))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flag the measurements slower than the baseline by more than the tolerance.
+
+    Returns:
+    ---------------------
+    regressions : list
+        List of (result, baseline seconds) pairs.
+    """
+    key = lambda result: (result['stage'], result['assets'], result['days'])
+    baseline_seconds = {key(result): result['seconds'] for result in baseline['results'] if 'seconds' in result}
+
+    regressions = []
+    for result in results:
+        if 'seconds' not in result:
+            continue
+        reference = baseline_seconds.get(key(result))
+        if reference is not None and result['seconds'] > reference * (1 + tolerance):
+            regressions.append((result, reference))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assets', type=int, nargs='+', help='asset counts (default: {})'.format(ASSETS))
+    parser.add_argument('--days', type=int, nargs='+', help='history lengths (default: {})'.format(DAYS))
+    parser.add_argument('--quick', action='store_true', help='small grid for a fast check')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement (default: 3)')
+    parser.add_argument('--frontier-points', type=int, default=50)
+    parser.add_argument('--random-points', type=int, default=2000)
+    parser.add_argument('--max-optimizer-assets', type=int,
+                        help='skip the SLSQP stages above this asset count, the skips are recorded in the '
+                             'results (default: no limit)')
+    parser.add_argument('--no-figures', action='store_true', help='skip the Plotly and callback stages')
+    parser.add_argument('--save', help='save the results as a JSON baseline')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown ratio (default: 0.25)')
+    args = parser.parse_args()
+
+    # Measure the computations, not the shared result cache
+    shared_cache.CACHE_DIR = ''
+
+    asset_counts = args.assets or (QUICK_ASSETS if args.quick else ASSETS)
+    day_counts = args.days or (QUICK_DAYS if args.quick else DAYS)
+
+    results = run(asset_counts, day_counts, args.repeat, args.frontier_points, args.random_points,
+                  args.max_optimizer_assets, not args.no_figures)
+
+    if args.save:
+        report = {
+            'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'platform': platform.platform(), 'processor': platform.processor()},
+            'settings': {'repeat': args.repeat, 'frontier_points': args.frontier_points,
+                         'random_points': args.random_points, 'max_optimizer_assets': args.max_optimizer_assets},
+            'results': results,
+        }
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for result, reference in regressions:
+            print('REGRESSION {stage} N={assets} T={days}: {seconds:.4f}s'.format(**result),
+                  'vs {:.4f}s baseline'.format(reference))
+        if regressions:
+            return 1
+        print('No regression above {:.0%}'.format(args.tolerance))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
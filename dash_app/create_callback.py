@@ -1,10 +1,56 @@
-from dash import Input, Output, State
-from portfolio_optimizer.data_fetching import get_returns_df,get_statistical_summary
-from portfolio_optimizer.data_visulization import plot_stocks_line_chart,plot_correlation_matrix,efficient_frontier_with_details,plot_stocks_vs_portfolio
-from portfolio_optimizer.efficient_frontier import create_efficient_frontier,generate_random_portfolios,create_optimal_points
-from portfolio_optimizer.portfolio_optimization import get_max_sharp_ratio,get_portfolio_performance,get_minimum_variance
+import math
+from dash import Input, Output, State, html, Patch, ClientsideFunction
+from dash.exceptions import PreventUpdate
+from portfolio_optimizer.frontier_index import get_weights_for_std_from_index
+from portfolio_optimizer.instrumentation import collect_trace,stage_timer,format_trace
+from portfolio_optimizer.profiling import profile_request,profiling_enabled
+from dash_app.ticker_search import get_search_index,search_tickers
+from dash_app.partial_updates import diff_outputs
+from dash_app.downloads import download_links
 
 
+# Points kept per stock in the price line chart, at about the pixel width of the chart
+LINE_CHART_MAX_POINTS = 1500
+
+# Random portfolios aggregated in the efficient frontier heatmap of the density cloud mode
+DENSITY_PORTFOLIOS = 1000000
+
+# Above this many stocks the correlation heatmap is clustered and summarized by blocks
+LARGE_CORRELATION_SIZE = 60
+
+# Most stocks along each axis of a zoomed correlation heatmap shown cell by cell
+CORRELATION_DETAIL_MAX = 80
+
+# Annual risk-free rates of the tangency table, 0% to 10% in 0.05% steps. Other rates are
+# clipped to this range, in the figures (assets/risk_free_rate.js) and in the slider table
+TANGENCY_RATES = tuple(i / 2000 for i in range(201))
+
+# Outputs of update sent only when they changed, figures patched trace by trace (see dash_app.partial_updates)
+PARTIAL_OUTPUTS = ['stocks_line_chart', 'correlation', 'efficient_frontier', 'individual_stocks',
+                   'table_data', 'table_columns', 'frontier_index', 'tangency', 'correlation_order']
+
+
+
+def _annual_rate(rate, unit, period):
+    # Annual rate in decimal units clipped to TANGENCY_RATES, as annualRate and clipRate of assets/risk_free_rate.js
+    annual = float(rate or 0)
+    if unit == 'percent':
+        annual = annual / 100
+    if period == 'daily':
+        annual = annual * 252
+    return min(max(annual, TANGENCY_RATES[0]), TANGENCY_RATES[-1])
+
+
+def _axis_range(relayout_data, axis):
+    # (low, high) range of an axis from the relayoutData of a graph, None when it did not change
+    if axis + '.range[0]' in relayout_data and axis + '.range[1]' in relayout_data:
+        bounds = relayout_data[axis + '.range[0]'], relayout_data[axis + '.range[1]']
+    elif axis + '.range' in relayout_data:
+        bounds = relayout_data[axis + '.range']
+    else:
+        return None
+    return min(bounds), max(bounds)
+
 
 def create_callback(app):
     """
@@ -18,20 +64,74 @@ def create_callback(app):
 
     """
 
+    def calculate(stock_list, start_date, end_date, cloud_mode='points', signatures=None):
+        """
+        Run the pipeline and build the figures, tables and stores of the update callback.
+
+        Parameters:
+            stock_list (list): List of selected stocks
+            start_date (str): Start date of the selected period
+            end_date (str): End date of the selected period
+            cloud_mode (str): 'points' plots every random portfolio, 'density' a heatmap of many more
+            signatures (dict): Signatures of the outputs displayed by the browser
+
+        Returns:
+            tuple: Figures and data for the Dash components (unchanged ones replaced by dash.no_update)
+                and the new signatures, without the profile links.
+        """
+        # Imported on the first calculation so that server processes start quickly
+        from portfolio_optimizer.pipeline import pipeline_params
+        from portfolio_optimizer.pipeline_graph import evaluate_graph
+        from dash_app.figure_stages import APP_STAGES, APP_TARGETS
+
+        with collect_trace() as trace, stage_timer('update'):
+            # Evaluate the pipeline and figure stages, the stages whose inputs did not change are reused
+            params = pipeline_params(stock_list, start_date, end_date,
+                                     number_of_density_portfolios=DENSITY_PORTFOLIOS if cloud_mode == 'density' else 0)
+            params.update({
+                'line_chart_max_points': LINE_CHART_MAX_POINTS,
+                'large_correlation_size': LARGE_CORRELATION_SIZE,
+                'tangency_rates': TANGENCY_RATES,
+            })
+            results = evaluate_graph(APP_STAGES, APP_TARGETS, params)
+            corr_fig, correlation_order = results['correlation_figure']
+            data, columns = results['optimal_table']
+
+            # Remember the query so zooming can re-fetch the prices at full resolution
+            price_query = {'stock_list': stock_list, 'start_date': start_date, 'end_date': end_date}
+
+            # Send only what differs from the outputs the browser already has
+            with stage_timer('partial_updates'):
+                outputs = (results['line_chart'], corr_fig, results['frontier_figure'], results['stocks_figure'], data,
+                           columns, results['frontier_index'], results['tangency'], correlation_order)
+                values, signatures = diff_outputs(dict(zip(PARTIAL_OUTPUTS, outputs)), signatures)
+
+        return tuple(values[name] for name in PARTIAL_OUTPUTS) + (price_query, format_trace(trace), signatures)
+
     @app.callback(
         [Output('Adj Close Figure Plot', 'figure'),
          Output('Correlation Figure', 'figure'),
          Output('efficient frontier figure', 'figure'),
          Output('Individual Stocks figure', 'figure'),
          Output('table-container', 'data'),
-         Output('table-container', 'columns')],
+         Output('table-container', 'columns'),
+         Output('Frontier Store', 'data'),
+         Output('Tangency Store', 'data'),
+         Output('Correlation Store', 'data'),
+         Output('Price Query Store', 'data'),
+         Output('Debug Panel', 'children'),
+         Output('Figure Signatures', 'data'),
+         Output('Profile Links', 'children')],
         [Input('Calculate Button', 'n_clicks')],
         [State('Stocks Dropdown', 'value'),
          State('Date Picker', 'start_date'),
-         State('Date Picker', 'end_date')],
+         State('Date Picker', 'end_date'),
+         State('Profile Checklist', 'value'),
+         State('Cloud Mode', 'value'),
+         State('Figure Signatures', 'data')],
         prevent_initial_call=True
     )
-    def update(_, stock_list, start_date, end_date):
+    def update(_, stock_list, start_date, end_date, profile_options=None, cloud_mode=None, signatures=None):
         """
         Update figures and tables based on user input.
 
@@ -40,57 +140,242 @@ def create_callback(app):
             stock_list (list): List of selected stocks
             start_date (str): Start date of the selected period
             end_date (str): End date of the selected period
+            profile_options (list): ['profile'] to profile this request
+            cloud_mode (str): 'points' or 'density' rendering of the random portfolios
+            signatures (dict): Signatures of the outputs of the last response
 
         Returns:
             tuple: Figures and data for the Dash components.
         """
 
-        # Fetch returns DataFrame based on user input
-        df = get_returns_df(stock_list, start_date, end_date)
+        if 'profile' in (profile_options or []) or profiling_enabled():
+            # Profile only this request, nothing is recorded otherwise
+            with profile_request('update') as report:
+                outputs = calculate(stock_list, start_date, end_date, cloud_mode or 'points', signatures)
+            profile_links = [html.A(name, href='/profiles/' + name, style={'margin-right': '2%'}) for name in report['files']]
+        else:
+            outputs = calculate(stock_list, start_date, end_date, cloud_mode or 'points', signatures)
+            profile_links = []
+
+        return outputs + (profile_links,)
+
+    # Sharpe ratios, random portfolio colors, max Sharpe point and capital market line for the
+    # risk-free rate, recomputed in the browser by assets/risk_free_rate.js. It also runs after
+    # every calculation, when the signatures store is written, as new figures are sent at a zero rate.
+    app.clientside_callback(
+        ClientsideFunction(namespace='portfolio', function_name='applyRiskFreeRate'),
+        [Output('efficient frontier figure', 'figure', allow_duplicate=True),
+         Output('Individual Stocks figure', 'figure', allow_duplicate=True),
+         Output('Rate Note', 'children')],
+        [Input('Risk Free Rate', 'value'),
+         Input('Rate Unit', 'value'),
+         Input('Rate Period', 'value'),
+         Input('Figure Signatures', 'data')],
+        [State('Tangency Store', 'data'),
+         State('efficient frontier figure', 'figure'),
+         State('Individual Stocks figure', 'figure')],
+        prevent_initial_call=True
+    )
+
+    @app.callback(
+        Output('Adj Close Figure Plot', 'figure', allow_duplicate=True),
+        Output('Figure Signatures', 'data', allow_duplicate=True),
+        Input('Adj Close Figure Plot', 'relayoutData'),
+        State('Price Query Store', 'data'),
+        prevent_initial_call=True
+    )
+    def zoom_stocks_line_chart(relayout_data, price_query):
+        """
+        Re-sample the price lines to the visible date range when the user zooms or pans.
+
+        Parameters:
+            relayout_data (dict): Axis changes of the line chart
+            price_query (dict): Stocks and dates of the last calculation
+
+        Returns:
+            tuple: dash.Patch of the new x and y arrays of every line, the layout stays on the client,
+                and dash.Patch forgetting the signature of the line chart.
+        """
+
+        if not relayout_data or not price_query:
+            raise PreventUpdate
+
+        if 'xaxis.autorange' in relayout_data:
+            start, end = None, None
+        elif 'xaxis.range[0]' in relayout_data:
+            start, end = relayout_data['xaxis.range[0]'], relayout_data.get('xaxis.range[1]')
+        elif 'xaxis.range' in relayout_data:
+            start, end = relayout_data['xaxis.range']
+        else:
+            raise PreventUpdate
+
+        from portfolio_optimizer.data_fetching import get_returns_df
+        from portfolio_optimizer.downsampling import downsampled_line_data
+        from portfolio_optimizer.pipeline import pipeline_params
+
+        # The prices come from the cache filled by the calculation, in the dtype it stored them in
+        params = pipeline_params(price_query['stock_list'], price_query['start_date'], price_query['end_date'])
+        df = get_returns_df(price_query['stock_list'], price_query['start_date'], price_query['end_date'],
+                            dtype=params['returns_dtype'])
+        visible = df.loc[start:end]
+
+        patch = Patch()
+        for i, (_, dates, prices) in enumerate(downsampled_line_data(visible, LINE_CHART_MAX_POINTS)):
+            patch['data'][i]['x'] = dates
+            patch['data'][i]['y'] = prices
+
+        # The displayed lines no longer match the last calculation, so the next one resends them
+        signatures = Patch()
+        del signatures['stocks_line_chart']
+
+        return patch, signatures
+
+    @app.callback(
+        Output('Correlation Figure', 'figure', allow_duplicate=True),
+        Output('Figure Signatures', 'data', allow_duplicate=True),
+        Input('Correlation Figure', 'relayoutData'),
+        State('Price Query Store', 'data'),
+        State('Correlation Store', 'data'),
+        prevent_initial_call=True
+    )
+    def zoom_correlation_matrix(relayout_data, price_query, correlation_order):
+        """
+        Show the cells of the zoomed window of a clustered correlation heatmap, and the block summary when zoomed out.
+
+        Parameters:
+            relayout_data (dict): Axis changes of the heatmap
+            price_query (dict): Stocks and dates of the last calculation
+            correlation_order (list): Clustered order of the stocks, None when the heatmap is not clustered
+
+        Returns:
+            tuple: dash.Patch of the heatmap data and axis ticks, and dash.Patch forgetting its signature.
+        """
+
+        if not relayout_data or not price_query or not correlation_order:
+            raise PreventUpdate
 
-        # Generate line chart for individual stocks
-        stock_line_chart = plot_stocks_line_chart(df)
+        rows, columns = _axis_range(relayout_data, 'yaxis'), _axis_range(relayout_data, 'xaxis')
+        if 'xaxis.autorange' in relayout_data or 'yaxis.autorange' in relayout_data:
+            rows, columns = None, None
+        elif rows is None or columns is None:
+            raise PreventUpdate
+        else:
+            # Cells are centered on the integer positions of the clustered order
+            rows, columns = [(max(0, math.floor(low + 0.5)), min(len(correlation_order), math.floor(high + 0.5) + 1))
+                             for low, high in (rows, columns)]
+            if max(rows[1] - rows[0], columns[1] - columns[0]) > CORRELATION_DETAIL_MAX:
+                rows, columns = None, None
 
-        # Calculate statistical summary
-        mean_return, cov, corr, std, annualized_return, annualized_risk = get_statistical_summary(df)
+        from portfolio_optimizer.fast_figures import correlation_view
+        from portfolio_optimizer.pipeline import PIPELINE_STAGES, pipeline_params
+        from portfolio_optimizer.pipeline_graph import lookup_stage
 
-        # Generate correlation matrix figure
-        corr_fig = plot_correlation_matrix(corr)
+        # Zooming only reads the statistics memoized by the calculation: recomputed ones could
+        # come from newer prices and no longer match the clustered order of the browser
+        params = pipeline_params(price_query['stock_list'], price_query['start_date'], price_query['end_date'])
+        found, statistics = lookup_stage(PIPELINE_STAGES, 'statistics', params)
+        if not found:
+            raise PreventUpdate
+        corr = statistics[2]
+        view = correlation_view(corr, correlation_order, rows=rows, columns=columns)
 
-        # Create efficient frontier data
-        efficient_frontier_data = create_efficient_frontier(stock_list, mean_return, cov, number_of_portfolios=500)
+        patch = Patch()
+        for key, value in view['trace'].items():
+            patch['data'][0][key] = value
+        for axis in ('xaxis', 'yaxis'):
+            for key, value in view[axis].items():
+                patch['layout'][axis][key] = value
 
-        # Generate random portfolios for efficient frontier plot
-        random_portfolios = generate_random_portfolios(efficient_frontier_data.columns, 2000, stock_list, mean_return, cov)
+        # The displayed heatmap no longer matches the last calculation, so the next one resends it
+        signatures = Patch()
+        del signatures['correlation']
+
+        return patch, signatures
+
+    @app.callback(
+        Output('Download Links', 'children'),
+        Input('Price Query Store', 'data'),
+        prevent_initial_call=True
+    )
+    def update_download_links(price_query):
+        """
+        Link the downloads of the results of the last calculation.
+
+        Parameters:
+            price_query (dict): Stocks and dates of the last calculation
+
+        Returns:
+            list: Download links.
+        """
 
-        # Calculate optimal portfolio points
-        max_sharpe_ratio, max_sharpe_ratio_weights = get_max_sharp_ratio(mean_return, cov)
-        max_return, max_return_std = get_portfolio_performance(max_sharpe_ratio_weights, mean_return, cov)
-        min_variance, min_variance_weights = get_minimum_variance(mean_return, cov)
-        min_risk_return, min_std = get_portfolio_performance(min_variance_weights, mean_return, cov)
+        if not price_query:
+            raise PreventUpdate
 
-        # Generate efficient frontier plot with key points
-        efficient_frontier = efficient_frontier_with_details(
-            max_return, max_return_std, max_sharpe_ratio, min_risk_return, min_std,
-            min_risk_return/min_std, efficient_frontier_data['Return'], efficient_frontier_data['Std'],
-            efficient_frontier_data['Sharpe Ratio'], random_portfolios['Return'], random_portfolios['Std'],
-            random_portfolios['Sharpe Ratio']
-        )
+        return [html.A(label, href=url, style={'margin-right': '2%'}) for label, url in download_links(price_query)]
+
+    @app.callback(
+        Output('Stocks Dropdown', 'options'),
+        Input('Stocks Dropdown', 'search_value'),
+        State('Stocks Dropdown', 'value'),
+    )
+    def update_ticker_options(search_value, selected):
+        """
+        Return the best ticker matches for the text typed in the dropdown.
+
+        Parameters:
+            search_value (str): Text typed in the dropdown
+            selected (list): Stocks already selected, kept in the options so they stay displayed
+
+        Returns:
+            list: Options of the dropdown.
+        """
+
+        if not search_value:
+            raise PreventUpdate
+
+        search_index = get_search_index()
+        options = [{'label': symbol, 'value': symbol} for symbol in (selected or [])]
+        options.extend(option for option in search_tickers(search_index, search_value)
+                       if option['value'] not in (selected or []))
+
+        return options
+
+    @app.callback(
+        [Output('slider-table', 'data'),
+         Output('slider-table', 'columns')],
+        [Input('Risk Slider', 'value'),
+         Input('Frontier Store', 'data'),
+         Input('Risk Free Rate', 'value'),
+         Input('Rate Unit', 'value'),
+         Input('Rate Period', 'value')],
+        prevent_initial_call=True
+    )
+    def update_slider_portfolio(position, frontier_index, rate, unit, period):
+        """
+        Look up the frontier portfolio for the risk level chosen on the slider.
+
+        Parameters:
+            position (float): Slider position, 0 is the least and 1 the most volatile frontier portfolio
+            frontier_index (dict): Frontier index stored by update
+            rate (float): Risk-free rate of the Sharpe ratio, as entered
+            unit (str): 'percent' or 'decimal'
+            period (str): 'annual' or 'daily'
+
+        Returns:
+            tuple: Data and columns of the slider table.
+        """
 
-        # Generate plot comparing individual stocks with the portfolio
-        individual_stocks_figure = plot_stocks_vs_portfolio(
-            max_return, max_return_std, max_sharpe_ratio, min_risk_return, min_std, min_risk_return/min_std,
-            efficient_frontier_data['Return'], efficient_frontier_data['Std'], efficient_frontier_data['Sharpe Ratio'],
-            annualized_return, annualized_risk
-        )
+        if not frontier_index or not frontier_index['Std']:
+            raise PreventUpdate
 
-        # Create optimal points data for the table
-        optimal_points = create_optimal_points(
-            efficient_frontier_data.columns.to_list(), max_return, max_return_std, max_sharpe_ratio_weights,
-            min_risk_return, min_std, min_variance_weights
-        )
+        min_std, max_std = frontier_index['Std'][0], frontier_index['Std'][-1]
+        std_target = min_std + position * (max_std - min_std)
+        Return, std, weights = get_weights_for_std_from_index(frontier_index, std_target)
 
-        data = optimal_points.to_dict('records')
-        columns = [{"name": col, 'id': col} for col in optimal_points.columns]
+        row = {'Portfolio Type': 'Target Volatility'}
+        row.update(zip(frontier_index['Stocks'], weights.round(3).tolist()))
+        sharpe_ratio = (Return - _annual_rate(rate, unit, period)) / std
+        row.update({'Return': round(Return, 3), 'Std': round(std, 3), 'Sharpe Ratio': round(sharpe_ratio, 3)})
+        columns = [{"name": col, 'id': col} for col in row]
 
-        return stock_line_chart, corr_fig, efficient_frontier, individual_stocks_figure, data, columns
+        return [row], columns
@@ -1,5 +1,4 @@
 from dash import html, dcc
-import pandas as pd
 import datetime
 
 def create_main_div():
@@ -11,10 +10,6 @@ def create_main_div():
 
     """
 
-    # Read the DataFrame from Excel
-    df = pd.read_excel(r'.\S&P500 Company Ticker.xlsx')
-    symbols_list = df['Ticker'].to_list()
-
     # Define styles for main_div and button
     main_div_style = {
         'width': '30%',
@@ -63,8 +58,16 @@ def create_main_div():
             html.H3('Select Historical Time Periods (MM/DD/YYYY)', style={'color': 'white', 'margin-top': '20vh', 'font-size': '2.5vh'}),
             html.Div(children=[date_picker_range]),
             html.H3('Choose a portfolio of stocks', style={'color': 'white', 'margin-top': '6vh', 'font-size': '3vh'}),
-            dcc.Dropdown(id='Stocks Dropdown',options=[{'label': symbol, 'value': symbol} for symbol in symbols_list], style={'width': '98%'}, placeholder='Select from S&P500 stocks!',multi=True),
-            html.Button('Calculate!', id='Calculate Button',n_clicks=0, style=button_style)
+            # The options are searched on the server as the user types, see update_ticker_options
+            dcc.Dropdown(id='Stocks Dropdown',options=[], style={'width': '98%'}, placeholder='Type to search S&P500 stocks!',multi=True),
+            # Density aggregates a million random portfolios into one heatmap instead of plotting each one
+            dcc.RadioItems(id='Cloud Mode',
+                           options=[{'label': ' Portfolio points', 'value': 'points'},
+                                    {'label': ' Portfolio density', 'value': 'density'}],
+                           value='points', inline=True, style={'color': 'white', 'margin-top': '2vh'}),
+            html.Button('Calculate!', id='Calculate Button',n_clicks=0, style=button_style),
+            dcc.Checklist(id='Profile Checklist', options=[{'label': ' Profile this calculation', 'value': 'profile'}],
+                          value=[], style={'color': 'gray', 'margin-top': '2vh', 'margin-left': '10vh'})
         ]
     )
 
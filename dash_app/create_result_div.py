@@ -1,3 +1,4 @@
+import os
 import dash_table
 from dash import html,dcc
 from dash_app.convert_image_to_data_uri import convert_image_to_data_uri
@@ -37,7 +38,10 @@ def create_result_div():
         children=[
             html.H1('Summary of portfolio stocks', style={'margin-left': '2%', 'font-weight': 'bold', 'height': '10vh'}),
             dcc.Graph(id='Adj Close Figure Plot', figure={}, style={'width': '100%', 'height': '700px', 'margin-bottom': '2%'}),
-            dcc.Graph(id='Correlation Figure', figure={})
+            dcc.Graph(id='Correlation Figure', figure={}),
+            dcc.Store(id='Price Query Store'),
+            # Clustered order of the stocks of a large correlation heatmap
+            dcc.Store(id='Correlation Store')
         ])
 
     # Define content for portfolio_statistics_page
@@ -50,8 +54,39 @@ def create_result_div():
             html.Div(style={'width': '80%', 'height': '20vh', 'margin-left': '2%'}, children=[
                 dash_table.DataTable(id='table-container', page_action='none',)
             ]),
+            # Arrow and Parquet downloads of the results of the last calculation
+            html.Div(id='Download Links', style={'margin-left': '2%'}),
+            html.H3('Portfolio for a chosen risk level (from lowest to highest frontier volatility):', style={'margin-left': '2%'}),
+            html.Div(style={'width': '80%', 'margin-left': '2%'}, children=[
+                dcc.Slider(id='Risk Slider', min=0, max=1, step=0.01, value=0.5, marks={0: 'Min', 1: 'Max'}),
+                dash_table.DataTable(id='slider-table', page_action='none',)
+            ]),
+            dcc.Store(id='Frontier Store'),
+            # The risk-free rate is applied to the figures in the browser, see assets/risk_free_rate.js
+            html.Div(style={'margin-left': '2%', 'margin-top': '2vh'}, children=[
+                html.Label('Risk-free rate: '),
+                dcc.Input(id='Risk Free Rate', type='number', value=0, step=0.01, debounce=True),
+                dcc.RadioItems(id='Rate Unit', options=[{'label': ' %', 'value': 'percent'},
+                                                        {'label': ' decimal', 'value': 'decimal'}],
+                               value='percent', inline=True, style={'display': 'inline-block', 'margin-left': '2%'}),
+                dcc.RadioItems(id='Rate Period', options=[{'label': ' annual', 'value': 'annual'},
+                                                          {'label': ' daily', 'value': 'daily'}],
+                               value='annual', inline=True, style={'display': 'inline-block', 'margin-left': '2%'}),
+                # Says when the rate is outside of the tangency table and was clipped
+                html.Span(id='Rate Note', style={'margin-left': '2%', 'color': 'darkred'}),
+            ]),
+            dcc.Store(id='Tangency Store'),
             dcc.Graph(id='efficient frontier figure', figure={}),
-            dcc.Graph(id='Individual Stocks figure', figure={})
+            dcc.Graph(id='Individual Stocks figure', figure={}),
+            # Timings of the last calculation, shown when PORTFOLIO_DEBUG_PANEL is set
+            html.Pre(id='Debug Panel', style={
+                'display': 'block' if os.environ.get('PORTFOLIO_DEBUG_PANEL') else 'none',
+                'margin-left': '2%', 'font-size': '12px'
+            }),
+            # Download links of the profile of the last calculation, when profiling was requested
+            html.Div(id='Profile Links', style={'margin-left': '2%'}),
+            # Signatures of the displayed figures and tables, so a calculation only sends what changed
+            dcc.Store(id='Figure Signatures')
         ])
 
     # Combine the pages into the result_div
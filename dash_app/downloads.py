@@ -0,0 +1,100 @@
+import io
+from urllib.parse import urlencode
+from flask import Response, abort, request
+
+
+# Results that can be downloaded, and how to get them from the values of the pipeline stages
+DOWNLOADS = {
+    'efficient_frontier': ('efficient_frontier', lambda value: value),
+    'random_portfolios': ('random_portfolios', lambda value: value),
+    'optimal_points': ('optimal_portfolios', lambda value: value['optimal_points']),
+}
+FORMATS = {
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Rows per Arrow record batch of a streamed download
+BATCH_SIZE = 65536
+
+
+
+def download_links(price_query):
+    """
+    Links to the downloads of the results of a calculation.
+
+    Parameters:
+        price_query (dict): Stocks and dates of the calculation, from the Price Query Store.
+
+    Returns:
+        list: (label, URL) pairs.
+
+    """
+    query = urlencode({
+        'stocks': ','.join(price_query['stock_list']),
+        'start_date': price_query['start_date'] or '',
+        'end_date': price_query['end_date'] or '',
+    })
+    return [('{} ({})'.format(kind.replace('_', ' '), extension), '/download/{}.{}?{}'.format(kind, extension, query))
+            for kind in DOWNLOADS for extension in FORMATS]
+
+
+def _stream_arrow(table):
+    # Arrow IPC stream written batch by batch, each batch is sent as soon as it is written
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=BATCH_SIZE):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # End of stream marker
+    yield sink.getvalue()
+
+
+def register_download_routes(server):
+    """
+    Serve the results of a calculation at /download/<kind>.<arrow|parquet>?stocks=...&start_date=...&end_date=...
+
+    The results come from the memoized pipeline stages of a calculation run by the app,
+    nothing is computed for a download: results that are not memoized (any more) are a 404.
+    The columns of the DataFrames are converted to Arrow as they are, without going
+    through Python row dicts.
+
+    Parameters:
+        server (flask.Flask): The Flask server of the Dash app.
+
+    """
+
+    @server.route('/download/<kind>.<extension>')
+    def download_results(kind, extension):
+        if kind not in DOWNLOADS or extension not in FORMATS or not request.args.get('stocks'):
+            abort(404)
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            abort(501, 'Install pyarrow to download the results.')
+
+        from portfolio_optimizer.pipeline import PIPELINE_STAGES, pipeline_params
+        from portfolio_optimizer.pipeline_graph import lookup_stage
+
+        stage, extract = DOWNLOADS[kind]
+        params = pipeline_params(request.args['stocks'].split(','), request.args.get('start_date') or None,
+                                 request.args.get('end_date') or None)
+        found, value = lookup_stage(PIPELINE_STAGES, stage, params)
+        if not found:
+            abort(404, 'Run the calculation before downloading its results.')
+        frame = extract(value)
+        table = pa.Table.from_pandas(frame.infer_objects(), preserve_index=False)
+
+        headers = {'Content-Disposition': 'attachment; filename={}.{}'.format(kind, extension)}
+        if extension == 'arrow':
+            return Response(_stream_arrow(table), mimetype=FORMATS[extension], headers=headers)
+
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+        return Response(buffer.getvalue(), mimetype=FORMATS[extension], headers=headers)
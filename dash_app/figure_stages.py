@@ -0,0 +1,78 @@
+from portfolio_optimizer.correlation_clustering import cluster_order
+from portfolio_optimizer.fast_figures import (
+    fast_stocks_line_chart, fast_correlation_matrix, fast_clustered_correlation_matrix,
+    fast_efficient_frontier_with_details, fast_stocks_vs_portfolio
+)
+from portfolio_optimizer.frontier_index import build_frontier_index, frontier_index_to_dict, get_tangency_portfolios
+from portfolio_optimizer.pipeline import PIPELINE_STAGES
+from portfolio_optimizer.pipeline_graph import pipeline_stage
+
+
+
+def line_chart_stage(df, line_chart_max_points):
+    return fast_stocks_line_chart(df, line_chart_max_points)
+
+
+def correlation_stage(statistics, large_correlation_size):
+    """
+    Correlation heatmap and the clustered order of its stocks (None when it is not clustered).
+    """
+    corr = statistics[2]
+    # Large baskets are clustered and summarized, zooming loads the cells (see zoom_correlation_matrix)
+    if len(corr) > large_correlation_size:
+        correlation_order = cluster_order(corr)
+        return fast_clustered_correlation_matrix(corr, correlation_order), correlation_order
+    return fast_correlation_matrix(corr), None
+
+
+def frontier_figure_stage(efficient_frontier_data, random_portfolios, density, optimal):
+    return fast_efficient_frontier_with_details(
+        optimal['max_return'], optimal['max_return_std'], optimal['max_sharpe_ratio'], optimal['min_risk_return'],
+        optimal['min_std'], optimal['min_risk_return']/optimal['min_std'], efficient_frontier_data['Return'],
+        efficient_frontier_data['Std'], efficient_frontier_data['Sharpe Ratio'], random_portfolios['Return'],
+        random_portfolios['Std'], random_portfolios['Sharpe Ratio'], density=density
+    )
+
+
+def stocks_figure_stage(efficient_frontier_data, optimal, statistics):
+    annualized_return, annualized_risk = statistics[4:6]
+    return fast_stocks_vs_portfolio(
+        optimal['max_return'], optimal['max_return_std'], optimal['max_sharpe_ratio'], optimal['min_risk_return'],
+        optimal['min_std'], optimal['min_risk_return']/optimal['min_std'], efficient_frontier_data['Return'],
+        efficient_frontier_data['Std'], efficient_frontier_data['Sharpe Ratio'], annualized_return, annualized_risk
+    )
+
+
+def optimal_table_stage(optimal):
+    optimal_points = optimal['optimal_points']
+    return optimal_points.to_dict('records'), [{"name": col, 'id': col} for col in optimal_points.columns]
+
+
+def frontier_index_stage(efficient_frontier_data, stock_list):
+    # Index the frontier so the risk slider can look up portfolios without solving
+    return frontier_index_to_dict(build_frontier_index(efficient_frontier_data, list(stock_list)))
+
+
+def tangency_stage(frontier_index, tangency_rates):
+    # Tangency portfolios for a range of rates, so the browser moves the max Sharpe point without solving
+    return get_tangency_portfolios(frontier_index, tangency_rates) if frontier_index['Std'] else None
+
+
+# The pipeline graph extended with the outputs of the update callback. The figures only
+# depend on display parameters and on the stages they draw, so changing a display
+# parameter rebuilds the figures without running the optimizers again.
+APP_STAGES = dict(PIPELINE_STAGES, **{stage['name']: stage for stage in [
+    pipeline_stage('line_chart', line_chart_stage, inputs=('fetch',), params=('line_chart_max_points',)),
+    pipeline_stage('correlation_figure', correlation_stage, inputs=('statistics',),
+                   params=('large_correlation_size',)),
+    pipeline_stage('frontier_figure', frontier_figure_stage,
+                   inputs=('efficient_frontier', 'random_portfolios', 'portfolio_density', 'optimal_portfolios')),
+    pipeline_stage('stocks_figure', stocks_figure_stage, inputs=('efficient_frontier', 'optimal_portfolios', 'statistics')),
+    pipeline_stage('optimal_table', optimal_table_stage, inputs=('optimal_portfolios',)),
+    pipeline_stage('frontier_index', frontier_index_stage, inputs=('efficient_frontier',), params=('stock_list',)),
+    pipeline_stage('tangency', tangency_stage, inputs=('frontier_index',), params=('tangency_rates',)),
+]})
+
+# Stages whose values the update callback sends
+APP_TARGETS = ['line_chart', 'correlation_figure', 'frontier_figure', 'stocks_figure', 'optimal_table',
+               'frontier_index', 'tangency']
@@ -0,0 +1,17 @@
+from flask import Response
+from portfolio_optimizer.instrumentation import render_prometheus
+
+
+
+def register_metrics_route(server):
+    """
+    Serve the pipeline metrics at /metrics in the Prometheus text format.
+
+    Parameters:
+        server (flask.Flask): The Flask server of the Dash app.
+
+    """
+
+    @server.route('/metrics')
+    def metrics():
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
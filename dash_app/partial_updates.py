@@ -0,0 +1,94 @@
+import hashlib
+from dash import Patch, no_update
+from portfolio_optimizer.fast_figures import figure_to_json
+
+
+
+def signature(value):
+    """
+    Short hash of a JSON serializable value (numpy arrays included).
+
+    Parameters:
+        value: Figure, trace, array or any other callback output.
+
+    Returns:
+        str: Hex digest of the JSON of the value.
+
+    """
+    return hashlib.blake2b(figure_to_json(value), digest_size=8).hexdigest()
+
+
+def figure_signature(figure):
+    """
+    Signature of a dict figure: one hash for the layout and one per property of every trace.
+
+    Parameters:
+        figure (dict): Figure with 'data' and 'layout'.
+
+    Returns:
+        dict: {'layout': hash, 'traces': [{property: hash}]}.
+
+    """
+    return {
+        'layout': signature(figure.get('layout', {})),
+        'traces': [{key: signature(value) for key, value in trace.items()} for trace in figure['data']],
+    }
+
+
+def diff_figure(figure, previous):
+    """
+    Smallest update of a figure already displayed with the signature previous.
+
+    Nothing is sent when nothing changed. When the layout and the trace properties are the
+    same, only the changed properties of the changed traces are sent as a dash.Patch, so the
+    layout and the other arrays stay on the client. Otherwise the whole figure is sent.
+
+    Parameters:
+        figure (dict): New figure.
+        previous (dict): figure_signature of the displayed figure, None if unknown.
+
+    Returns:
+        tuple: Output value (figure, dash.Patch or dash.no_update) and signature of the new figure.
+
+    """
+    current = figure_signature(figure)
+    if previous is None or previous['layout'] != current['layout'] \
+            or len(previous['traces']) != len(current['traces']) \
+            or any(old.keys() != new.keys() for old, new in zip(previous['traces'], current['traces'])):
+        return figure, current
+
+    patch = Patch()
+    changed = False
+    for i, (old, new) in enumerate(zip(previous['traces'], current['traces'])):
+        for key, value in new.items():
+            if old[key] != value:
+                patch['data'][i][key] = figure['data'][i][key]
+                changed = True
+
+    return (patch if changed else no_update), current
+
+
+def diff_outputs(outputs, signatures):
+    """
+    Replace the outputs of a callback that did not change since the last response.
+
+    Parameters:
+        outputs (dict): New output values by name. Dicts with 'data' and 'layout' are
+            figures and are diffed trace by trace, the other values as a whole.
+        signatures (dict): Signatures of the displayed outputs by name, from the last
+            response (the data of a dcc.Store), None on the first call.
+
+    Returns:
+        tuple: Dict of the values to send (dash.no_update for unchanged outputs) and
+            the signatures of the new outputs.
+
+    """
+    signatures = signatures or {}
+    values, new_signatures = {}, {}
+    for name, value in outputs.items():
+        if isinstance(value, dict) and 'data' in value and 'layout' in value:
+            values[name], new_signatures[name] = diff_figure(value, signatures.get(name))
+        else:
+            new_signatures[name] = signature(value)
+            values[name] = no_update if signatures.get(name) == new_signatures[name] else value
+    return values, new_signatures
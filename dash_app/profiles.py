@@ -0,0 +1,21 @@
+import os
+from flask import abort, send_from_directory
+from portfolio_optimizer.profiling import PROFILE_DIR
+
+
+
+def register_profile_routes(server):
+    """
+    Serve the profiles written by portfolio_optimizer.profiling for download at /profiles/<file name>.
+
+    Parameters:
+        server (flask.Flask): The Flask server of the Dash app.
+
+    """
+
+    @server.route('/profiles/<path:filename>')
+    def download_profile(filename):
+        directory = os.path.abspath(PROFILE_DIR)
+        if not os.path.isfile(os.path.join(directory, filename)):
+            abort(404)
+        return send_from_directory(directory, filename, as_attachment=True)
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from portfolio_optimizer.instrumentation import record_stage
+
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_FILE = os.path.join(REPOSITORY, 'S&P500 Company Ticker.xlsx')
+INDEX_FILE = os.path.join(REPOSITORY, '.ticker_index.json')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+
+def compile_ticker_index(source_file=SOURCE_FILE, index_file=INDEX_FILE):
+    """
+    Compile the ticker spreadsheet into a compact JSON index.
+
+    Parameters:
+        source_file (str): Excel file with a 'Ticker' column and optional 'Name' and 'Sector' columns.
+        index_file (str): Path of the compiled index, not written if it cannot be.
+
+    Returns:
+        dict: The index, with the 'symbols', 'names' and 'sectors' lists and the size and
+        modification time of the source file it was compiled from.
+
+    """
+    import pandas as pd
+
+    status = os.stat(source_file)
+    df = pd.read_excel(source_file)
+    symbols = df['Ticker'].astype(str).str.strip().to_list()
+
+    index = {
+        'source_mtime': status.st_mtime,
+        'source_size': status.st_size,
+        'symbols': symbols,
+        'names': df['Name'].fillna('').astype(str).to_list() if 'Name' in df else [''] * len(symbols),
+        'sectors': df['Sector'].fillna('').astype(str).to_list() if 'Sector' in df else [''] * len(symbols),
+    }
+
+    # Write atomically, several workers may compile at the same time. On a read-only
+    # deploy the index is only kept in memory and compiled again by the next process.
+    temporary_file = '{}.{}.tmp'.format(index_file, os.getpid())
+    try:
+        with open(temporary_file, 'w') as file:
+            json.dump(index, file, separators=(',', ':'))
+        os.replace(temporary_file, index_file)
+    except OSError:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+
+    return index
+
+
+def _read_index(source_file, index_file):
+    try:
+        with open(index_file) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    # Recompile when the spreadsheet changed since the index was built
+    try:
+        status = os.stat(source_file)
+    except OSError:
+        return index
+    if index.get('source_mtime') != status.st_mtime or index.get('source_size') != status.st_size:
+        return None
+    return index
+
+
+def load_ticker_index():
+    """
+    Load the ticker index, compiling it first if the spreadsheet is newer than the compiled index.
+
+    The index is loaded on first use and kept in memory afterwards.
+
+    Returns:
+        dict: The index with the 'symbols', 'names' and 'sectors' lists.
+
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            start = time.perf_counter()
+            _index = _read_index(SOURCE_FILE, INDEX_FILE) or compile_ticker_index()
+            record_stage('ticker_index_load', time.perf_counter() - start)
+        return _index
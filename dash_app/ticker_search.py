@@ -0,0 +1,106 @@
+import bisect
+import threading
+from dash_app.ticker_index import load_ticker_index
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+
+def build_search_index(ticker_index):
+    """
+    Build the in-memory search index of the ticker universe.
+
+    Symbols and the words of the company names are kept in sorted lists, so prefix
+    matches are found by binary search. A lower case 'symbol name' string per ticker
+    is kept for the substring matches.
+
+    Parameters:
+        ticker_index (dict): Ticker index from load_ticker_index.
+
+    Returns:
+        dict: The search index.
+
+    """
+    symbols = ticker_index['symbols']
+    names = ticker_index.get('names') or [''] * len(symbols)
+
+    labels = ['{} - {}'.format(symbol, name) if name else symbol for symbol, name in zip(symbols, names)]
+    symbol_keys = sorted((symbol.lower(), i) for i, symbol in enumerate(symbols))
+    word_keys = sorted((word, i) for i, name in enumerate(names) for word in name.lower().split())
+
+    search_index = {
+        'symbols': symbols,
+        'labels': labels,
+        'symbol_keys': symbol_keys,
+        'word_keys': word_keys,
+        'haystack': [label.lower() for label in labels],
+    }
+
+    return search_index
+
+
+def get_search_index():
+    """
+    Return the search index of the ticker universe, built on first use.
+
+    Returns:
+        dict: The search index.
+
+    """
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = build_search_index(load_ticker_index())
+        return _search_index
+
+
+def _prefix_matches(keys, prefix):
+    # Every (key, position) pair whose key starts with prefix, in key order
+    start = bisect.bisect_left(keys, (prefix,))
+    for key, position in keys[start:]:
+        if not key.startswith(prefix):
+            break
+        yield position
+
+
+def search_tickers(search_index, query, limit=20):
+    """
+    Find the tickers matching a search string.
+
+    Matches are ranked: exact symbol, symbol prefix, company name word prefix, then
+    any substring of the symbol or name.
+
+    Parameters:
+        search_index (dict): Search index from build_search_index.
+        query (str): Text typed in the dropdown.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list: Dropdown options ({'label', 'value'}) of the best matches.
+
+    """
+    query = query.strip().lower()
+    if not query:
+        return []
+
+    found = []
+    seen = set()
+
+    def add(positions):
+        for position in positions:
+            if len(found) >= limit:
+                return
+            if position not in seen:
+                seen.add(position)
+                found.append(position)
+
+    # An exact symbol match sorts before the longer symbols it prefixes
+    add(_prefix_matches(search_index['symbol_keys'], query))
+    add(_prefix_matches(search_index['word_keys'], query))
+    if len(found) < limit:
+        add(position for position, text in enumerate(search_index['haystack']) if query in text)
+
+    return [{'label': search_index['labels'][position], 'value': search_index['symbols'][position]}
+            for position in found]
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from portfolio_optimizer.data_fetching import get_returns_df, get_statistical_summary
+from portfolio_optimizer.portfolio_optimization import (
+    get_max_sharp_ratio, get_minimum_variance, get_portfolio_performance
+)
+
+
+
+def optimize_basket(basket, mean_return, cov, risk_free_rate=0):
+    """
+    Find the maximum Sharpe ratio and minimum volatility portfolios of one basket.
+
+    Parameters:
+    ---------------------
+    basket : list
+        List of stock symbols in the basket.
+    mean_return : np.array
+        Mean return for each asset of the basket.
+    cov : np.array
+        Covariance matrix of the basket.
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+
+    Returns:
+    ---------------------
+    row : dict
+        One row of the batch result table.
+    weights : np.array
+        Weights of the maximum Sharpe ratio (first row) and minimum volatility (second row) portfolios.
+    """
+
+    max_sharpe_ratio, max_sharpe_ratio_weights = get_max_sharp_ratio(mean_return, cov, risk_free_rate)
+    max_return, max_return_std = get_portfolio_performance(max_sharpe_ratio_weights, mean_return, cov)
+    min_variance, min_variance_weights = get_minimum_variance(mean_return, cov)
+    min_risk_return, min_std = get_portfolio_performance(min_variance_weights, mean_return, cov)
+
+    row = {
+        'Basket': ','.join(basket),
+        'Max Sharpe Ratio': max_sharpe_ratio,
+        'Max Sharpe Return': max_return,
+        'Max Sharpe Std': max_return_std,
+        'Min Volatility Return': min_risk_return,
+        'Min Volatility Std': min_std,
+    }
+
+    return row, np.vstack((max_sharpe_ratio_weights, min_variance_weights))
+
+
+def optimize_baskets(baskets, start_date=None, end_date=None, risk_free_rate=0, max_workers=None):
+    """
+    Optimize many ticker baskets that share one price panel.
+
+    The union of all the tickers is downloaded once and a single covariance matrix is
+    computed. A basket traded on every day of the union calendar uses the matching slice
+    of the mean returns and covariance, which equals its own statistics since the returns
+    and the covariance are computed column by column and pairwise. A basket missing some
+    days of the union calendar (other tickers trade on days it does not, or before its
+    listing) gets its statistics computed on its own days, as a download of the basket
+    alone would give.
+
+    Parameters:
+    ---------------------
+    baskets : list
+        A list of baskets, each a list of stock symbols.
+    start_date : str, optional
+        Start date in the format (YYYY-MM-DD).
+    end_date : str, optional
+        End date in the format (YYYY-MM-DD).
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+    max_workers : int, optional
+        Number of worker processes. ``1`` optimizes in the current process,
+        ``None`` uses all the cores.
+
+    Returns:
+    ---------------------
+    results : pd.DataFrame
+        One row per basket, in the order of the baskets, with the return, standard
+        deviation and Sharpe ratio of its optimal portfolios.
+    weights : pd.DataFrame
+        Weights of the optimal portfolios in long format, one row per basket (position
+        in baskets), portfolio ('Max Sharpe' or 'Min Volatility') and ticker.
+    """
+
+    tickers = sorted(set().union(*baskets))
+
+    df = get_returns_df(tickers, start_date, end_date)
+    if isinstance(df, pd.Series):
+        df = df.to_frame(tickers[0])
+
+    mean_return, cov = get_statistical_summary(df[tickers])[:2]
+    mean_return, cov = mean_return.to_numpy(), cov.to_numpy()
+    position = {ticker: i for i, ticker in enumerate(tickers)}
+    baskets = [list(basket) for basket in baskets]
+
+    mean_returns, covs = [], []
+    for basket in baskets:
+        traded = df[basket].notna().any(axis=1).to_numpy()
+        if traded.all():
+            # Slice the sub-problem of the basket out of the shared statistics
+            index = [position[ticker] for ticker in basket]
+            mean_returns.append(mean_return[index])
+            covs.append(cov[np.ix_(index, index)])
+        else:
+            basket_mean_return, basket_cov = get_statistical_summary(df.loc[traded, basket])[:2]
+            mean_returns.append(basket_mean_return.to_numpy())
+            covs.append(basket_cov.to_numpy())
+
+    if max_workers == 1:
+        outcomes = list(map(optimize_basket, baskets, mean_returns, covs, repeat(risk_free_rate)))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(optimize_basket, baskets, mean_returns, covs, repeat(risk_free_rate),
+                                         chunksize=max(1, len(baskets) // 64)))
+
+    results = pd.DataFrame([row for row, _ in outcomes])
+
+    # One numeric row per (basket, portfolio, ticker)
+    weights = pd.DataFrame({
+        'Basket': np.repeat(np.arange(len(baskets)), [2 * len(basket) for basket in baskets]),
+        'Portfolio': np.concatenate([np.repeat(['Max Sharpe', 'Min Volatility'], len(basket)) for basket in baskets]),
+        'Ticker': np.concatenate([basket * 2 for basket in baskets]),
+        'Weight': np.concatenate([basket_weights.ravel() for _, basket_weights in outcomes]),
+    })
+
+    return results, weights
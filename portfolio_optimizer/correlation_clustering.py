@@ -0,0 +1,124 @@
+import numpy as np
+
+
+
+def cluster_order(corr):
+    """
+    Order the assets of a correlation matrix by hierarchical clustering.
+
+    Assets are clustered with average linkage on the correlation distance
+    sqrt((1 - correlation) / 2), and ordered as the leaves of the dendrogram,
+    so correlated assets are next to each other and form blocks on the heatmap.
+
+    Parameters:
+    ---------------------
+    corr : pd.DataFrame
+        Correlation matrix of the asset returns.
+
+    Returns:
+    ---------------------
+    order : list
+        Asset names in clustered order.
+    """
+    # Only large baskets are clustered, so scipy.cluster is not loaded for the others
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    from scipy.spatial.distance import squareform
+
+    names = list(corr.columns)
+    if len(names) < 3:
+        return names
+
+    values = np.nan_to_num(corr.to_numpy(dtype=float), nan=0.0)
+    distances = np.sqrt(np.clip((1 - values) / 2, 0, 1))
+    np.fill_diagonal(distances, 0)
+    tree = linkage(squareform(distances, checks=False), method='average')
+
+    return [names[i] for i in leaves_list(tree)]
+
+
+def get_block_edges(number_of_assets, number_of_blocks):
+    """
+    First position of every block when the assets are split in contiguous blocks of about equal size.
+
+    Parameters:
+    ---------------------
+    number_of_assets : int
+        Number of assets.
+    number_of_blocks : int
+        Maximum number of blocks.
+
+    Returns:
+    ---------------------
+    edges : np.array
+        Start position of each block, followed by number_of_assets.
+    """
+    block_size = max(1, int(np.ceil(number_of_assets / number_of_blocks)))
+    return np.append(np.arange(0, number_of_assets, block_size), number_of_assets)
+
+
+def get_block_summary(corr, order, number_of_blocks):
+    """
+    Average correlation between blocks of clustered assets.
+
+    Parameters:
+    ---------------------
+    corr : pd.DataFrame
+        Correlation matrix of the asset returns.
+    order : list
+        Asset names in clustered order, from cluster_order.
+    number_of_blocks : int
+        Maximum number of blocks along each axis.
+
+    Returns:
+    ---------------------
+    summary : dict
+        'centers' (block center positions in the clustered order), 'labels'
+        ('first - last' asset of each block) and 'z' (mean correlation between blocks).
+    """
+    values = corr.loc[order, order].to_numpy(dtype=float)
+    edges = get_block_edges(len(order), number_of_blocks)
+    starts, sizes = edges[:-1], np.diff(edges)
+
+    # Sum every block with reduceat along both axes, then divide by the cell counts
+    sums = np.add.reduceat(np.add.reduceat(np.nan_to_num(values), starts, axis=0), starts, axis=1)
+    counts = np.add.reduceat(np.add.reduceat(np.isfinite(values).astype(float), starts, axis=0), starts, axis=1)
+
+    summary = {
+        'centers': starts + (sizes - 1) / 2,
+        'labels': ['{} - {}'.format(order[start], order[start + size - 1]) if size > 1 else order[start]
+                   for start, size in zip(starts, sizes)],
+        'z': np.divide(sums, counts, out=np.full_like(sums, np.nan), where=counts > 0),
+    }
+
+    return summary
+
+
+def get_correlation_detail(corr, order, rows, columns):
+    """
+    Cell by cell correlations of a window of the clustered matrix.
+
+    Parameters:
+    ---------------------
+    corr : pd.DataFrame
+        Correlation matrix of the asset returns.
+    order : list
+        Asset names in clustered order, from cluster_order.
+    rows : tuple
+        (start, end) clustered positions of the rows (y axis), end excluded.
+    columns : tuple
+        (start, end) clustered positions of the columns (x axis), end excluded.
+
+    Returns:
+    ---------------------
+    detail : dict
+        'x' and 'y' (positions), 'x_labels' and 'y_labels' (asset names) and 'z' (correlations) of the window.
+    """
+    row_names, column_names = order[rows[0]:rows[1]], order[columns[0]:columns[1]]
+    detail = {
+        'x': np.arange(columns[0], columns[0] + len(column_names)),
+        'y': np.arange(rows[0], rows[0] + len(row_names)),
+        'x_labels': column_names,
+        'y_labels': row_names,
+        'z': corr.loc[row_names, column_names].to_numpy(dtype=float),
+    }
+    return detail
@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from portfolio_optimizer.portfolio_optimization import get_portfolio_performance
+from portfolio_optimizer.instrumentation import record_solver
+
+
+
+def get_scenario_matrix(returns):
+    """
+    Get the historical return scenarios as a NumPy matrix.
+
+    When the returns have no missing values after the first row the matrix is a view
+    on the returns DataFrame, so the scenarios share memory with the statistics step.
+
+    Parameters:
+    ---------------------
+    returns : pandas.DataFrame
+        Daily returns from get_daily_returns.
+
+    Returns:
+    ---------------------
+    scenarios : np.array
+        Array of shape (scenarios, assets) with one row per historical day.
+    """
+
+    # The first row of pct_change is always NaN
+    returns = returns.iloc[1:]
+    if returns.isna().to_numpy().any():
+        returns = returns.dropna()
+
+    return returns.to_numpy(dtype=float, copy=False)
+
+
+def get_portfolio_cvar(weights, scenarios, beta=0.95):
+    """
+    Calculate the historical conditional value at risk (expected shortfall) of a portfolio.
+
+    Parameters:
+    ---------------------
+    weights : np.array
+        Portfolio weights for each asset.
+    scenarios : np.array
+        Return scenarios of shape (scenarios, assets).
+    beta : float, optional
+        Confidence level (default is 0.95).
+
+    Returns:
+    ---------------------
+    cvar : float
+        Mean daily loss in the worst (1 - beta) share of the scenarios.
+    """
+
+    losses = -scenarios @ weights
+    var = np.quantile(losses, beta)
+    cvar = var + np.mean(np.maximum(losses - var, 0)) / (1 - beta)
+
+    return cvar
+
+
+def build_cvar_program(scenarios, beta=0.95):
+    """
+    Build the sparse Rockafellar-Uryasev linear program of the portfolio CVaR.
+
+    The variables are the weights (assets), the value at risk (1) and one
+    excess loss per scenario. Only the scenario block is dense, the excess
+    losses enter through a sparse identity so the constraint matrix has
+    scenarios * (assets + 2) non zeros.
+
+    Parameters:
+    ---------------------
+    scenarios : np.array
+        Return scenarios of shape (scenarios, assets).
+    beta : float, optional
+        Confidence level (default is 0.95).
+
+    Returns:
+    ---------------------
+    cvar_objective : np.array
+        Coefficients giving the CVaR as a linear function of the variables.
+    A_ub : scipy.sparse.csr_matrix
+        Scenario loss constraints, A_ub @ x <= 0.
+    A_eq : scipy.sparse.csr_matrix
+        Budget constraint, weights sum to 1.
+    bounds : list
+        Bounds of the variables.
+    """
+
+    number_of_scenarios, number_of_assets = scenarios.shape
+
+    # CVaR = VaR + sum(excess losses) / ((1 - beta) * scenarios)
+    cvar_objective = np.concatenate((
+        np.zeros(number_of_assets),
+        [1.],
+        np.full(number_of_scenarios, 1. / ((1 - beta) * number_of_scenarios)),
+    ))
+
+    # -r_s . w - VaR - u_s <= 0 for every scenario s
+    A_ub = sp.hstack((
+        sp.csr_matrix(-scenarios),
+        sp.csr_matrix(-np.ones((number_of_scenarios, 1))),
+        -sp.identity(number_of_scenarios, format='csr'),
+    ), format='csr')
+
+    A_eq = sp.csr_matrix(np.concatenate((
+        np.ones(number_of_assets), np.zeros(number_of_scenarios + 1)
+    ))[None, :])
+
+    bounds = [(0, 1)] * number_of_assets + [(None, None)] + [(0, None)] * number_of_scenarios
+
+    return cvar_objective, A_ub, A_eq, bounds
+
+
+def get_minimum_cvar(scenarios, beta=0.95, return_target=None):
+    """
+    Find the portfolio weights that correspond to the minimum CVaR.
+
+    Parameters:
+    ---------------------
+    scenarios : np.array
+        Return scenarios of shape (scenarios, assets).
+    beta : float, optional
+        Confidence level (default is 0.95).
+    return_target : float, optional
+        Minimum annualized portfolio return, no constraint if None.
+
+    Returns:
+    ---------------------
+    min_cvar : float
+        Minimum portfolio CVaR.
+    weights : np.array
+        Portfolio weights for the minimum CVaR.
+    """
+
+    number_of_assets = scenarios.shape[1]
+    cvar_objective, A_ub, A_eq, bounds = build_cvar_program(scenarios, beta)
+    b_ub = np.zeros(A_ub.shape[0])
+
+    if return_target is not None:
+        # -mean_return . w * 252 <= -return_target
+        return_row = np.zeros(A_ub.shape[1])
+        return_row[:number_of_assets] = -scenarios.mean(axis=0) * 252
+        A_ub = sp.vstack((A_ub, sp.csr_matrix(return_row[None, :])), format='csr')
+        b_ub = np.append(b_ub, -return_target)
+
+    results = linprog(cvar_objective, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[1.],
+                      bounds=bounds, method='highs')
+    record_solver('get_minimum_cvar', results)
+    if not results.success:
+        # results['x'] is None when HiGHS finds no solution, e.g. for an unreachable return target
+        raise ValueError('The minimum CVaR program failed: {}'.format(results.message))
+
+    min_cvar, weights = results['fun'], results['x'][:number_of_assets]
+
+    return min_cvar, weights
+
+
+def get_max_return_for_target_cvar(scenarios, cvar_target, beta=0.95, cvar_program=None):
+    """
+    Find the maximum return portfolio whose CVaR does not exceed a target.
+
+    Parameters:
+    ---------------------
+    scenarios : np.array
+        Return scenarios of shape (scenarios, assets).
+    cvar_target : float
+        Maximum allowed portfolio CVaR.
+    beta : float, optional
+        Confidence level (default is 0.95).
+    cvar_program : tuple, optional
+        Output of build_cvar_program, pass it to reuse the constraint matrix across targets.
+
+    Returns:
+    ---------------------
+    portfolio_return : float
+        Achieved annualized portfolio return.
+    weights : np.array
+        Portfolio weights for the target CVaR.
+    """
+
+    number_of_assets = scenarios.shape[1]
+    if cvar_program is None:
+        cvar_program = build_cvar_program(scenarios, beta)
+    cvar_objective, A_ub, A_eq, bounds = cvar_program
+
+    # Maximize the annualized return
+    objective = np.zeros(A_ub.shape[1])
+    objective[:number_of_assets] = -scenarios.mean(axis=0) * 252
+
+    # Add the CVaR limit as one more inequality row
+    A_ub = sp.vstack((A_ub, sp.csr_matrix(cvar_objective[None, :])), format='csr')
+    b_ub = np.zeros(A_ub.shape[0])
+    b_ub[-1] = cvar_target
+
+    results = linprog(objective, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[1.],
+                      bounds=bounds, method='highs')
+    record_solver('get_max_return_for_target_cvar', results)
+    if not results.success:
+        raise ValueError('The maximum return program for a CVaR of {} failed: {}'.format(cvar_target, results.message))
+
+    portfolio_return, weights = -results['fun'], results['x'][:number_of_assets]
+
+    return portfolio_return, weights
+
+
+def create_cvar_frontier(stock_list, scenarios, beta=0.95, risk_free_rate=0, number_of_portfolios=50):
+    """
+    Generate the mean-CVaR efficient frontier from historical return scenarios.
+
+    Parameters:
+    ---------------------
+    stock_list : list
+        List of stock symbols or names in the portfolio.
+    scenarios : np.array
+        Return scenarios of shape (scenarios, assets), e.g. from get_scenario_matrix.
+    beta : float, optional
+        Confidence level (default is 0.95).
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+    number_of_portfolios : int, optional
+        Number of portfolios to create on the frontier (default is 50).
+
+    Returns:
+    ---------------------
+    cvar_frontier_data : pd.DataFrame
+        DataFrame containing the frontier weights, return, standard deviation, Sharpe ratio and CVaR.
+    """
+
+    mean_return = scenarios.mean(axis=0)
+    cov = np.cov(scenarios, rowvar=False)
+    cvar_program = build_cvar_program(scenarios, beta)
+
+    # The frontier runs from the minimum CVaR portfolio to the best single asset
+    min_cvar, _ = get_minimum_cvar(scenarios, beta)
+    max_return_weights = np.zeros(len(stock_list))
+    max_return_weights[np.argmax(mean_return)] = 1
+    max_cvar = get_portfolio_cvar(max_return_weights, scenarios, beta)
+
+    cvar_targets = np.linspace(min_cvar, max(min_cvar, max_cvar), number_of_portfolios)
+
+    rows = []
+    for cvar_target in cvar_targets:
+        _, weights = get_max_return_for_target_cvar(scenarios, cvar_target, beta, cvar_program)
+        Return, std = get_portfolio_performance(weights, mean_return, cov)
+        cvar = get_portfolio_cvar(weights, scenarios, beta)
+        row = list(weights)
+        row.extend([Return, std, (Return - risk_free_rate) / std, cvar])
+        rows.append(row)
+
+    column_header = stock_list.copy()
+    column_header.extend(['Return', 'Std', 'Sharpe Ratio', 'CVaR'])
+    cvar_frontier_data = pd.DataFrame(rows, columns=column_header)
+
+    return cvar_frontier_data
@@ -1,11 +1,79 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
 from .portfolio_optimization import get_portfolio_performance
+from .instrumentation import record_cache, stage_timer
+from .shared_cache import cache_enabled, cache_key, get_cached, set_cached
 
 
+# Recently downloaded prices, keyed by (tickers, start_date, end_date, price epoch)
+PRICE_CACHE_SIZE = 32
+# Seconds after which the prices of a range without end date are downloaded again
+PRICE_TTL = float(os.environ.get('PORTFOLIO_PRICE_TTL', 3600))
+_price_cache = OrderedDict()
+_price_cache_lock = Lock()
 
-def get_returns_df(tickers, start_date=None,end_date=None):
+
+def download_prices(tickers, start_date=None, end_date=None):
+    '''download the adjusted close prices from the configured price provider
+
+    The provider is Yahoo Finance, unless the PORTFOLIO_PRICE_PROVIDER environment
+    variable is set to 'synthetic', in which case offline synthetic prices are
+    generated (for load tests and demos without network access)
+
+
+    Parameters
+    ---------------------
+    tickers: list
+        a list of symbols of the stocks
+    start_date: str
+        start date in the format (YYYY-MM-DD)
+    end_date: str
+        end date in the format (YYYY-MM-DD)
+
+
+    Returns
+    -------------------------
+    A Pandas DataFrame of the Adjusted close prices
+    '''
+
+    if os.environ.get('PORTFOLIO_PRICE_PROVIDER') == 'synthetic':
+        from .synthetic_data import synthetic_prices
+        return synthetic_prices(tickers if isinstance(tickers, (list, tuple)) else [tickers], start_date, end_date)
+
+    # yfinance is only imported when prices are actually downloaded
+    import yfinance as yf
+    return yf.download(tickers, start=start_date,end=end_date)['Adj Close']
+
+
+
+def get_price_epoch(end_date=None):
+    '''get the period of PRICE_TTL seconds the prices of a date range belong to
+
+    A range without end date gets new prices every day, so its cached prices, and
+    everything computed from them, are only reused within the same period
+
+
+    Parameters
+    ---------------------
+    end_date: str
+        end date in the format (YYYY-MM-DD)
+
+
+    Returns
+    -------------------------
+    None when the range has an end date, otherwise the number of the current period
+    '''
+    if end_date:
+        return None
+    return int(time.time() // PRICE_TTL)
+
+
+
+def get_returns_df(tickers, start_date=None,end_date=None, dtype=None):
     '''get the returns data of tickers you want 
 
 
@@ -16,24 +84,146 @@ def get_returns_df(tickers, start_date=None,end_date=None):
         a list of symbols of the stocks
     start_date: str
         start date you want to get the data from, and it suppose to be in that format (YYYY-MM-DD)
+    dtype: str, optional
+        Storage dtype of the prices, e.g. 'float32' so the cached prices of a large
+        panel take half the memory, the downloaded prices are converted once
 
 
     Returns
     -------------------------
-    A Pandas DataFrame with your desired data
+    A Pandas DataFrame with your desired data, the last PRICE_CACHE_SIZE
+    downloads are cached in memory so it is shared between callers and must not be
+    modified. Downloads are also kept in the shared disk cache, which other worker
+    processes read before downloading. Without end_date the cached prices expire
+    after PRICE_TTL seconds (see get_price_epoch)
     '''
 
-    df = yf.download(tickers, start=start_date,end=end_date)['Adj Close']
+    key = (tuple(sorted(tickers)) if isinstance(tickers, (list, tuple)) else tickers, start_date, end_date,
+           get_price_epoch(end_date), dtype)
+    with _price_cache_lock:
+        df = _price_cache.get(key)
+        if df is not None:
+            _price_cache.move_to_end(key)
+    record_cache('prices', df is not None)
+    if df is not None:
+        return df
+
+    shared_key = cache_key(os.environ.get('PORTFOLIO_PRICE_PROVIDER'), *key)
+    df = get_cached('prices', shared_key)
+    if cache_enabled():
+        record_cache('shared_prices', df is not None)
+    if df is None:
+        with stage_timer('download'):
+            df = download_prices(tickers, start_date, end_date)
+        if dtype is not None:
+            df = df.astype(dtype)
+        set_cached('prices', shared_key, df)
+
+    with _price_cache_lock:
+        _price_cache[key] = df
+        while len(_price_cache) > PRICE_CACHE_SIZE:
+            _price_cache.popitem(last=False)
     return df
 
 
-def get_statistical_summary(df):
+def get_daily_returns(df, dtype=None, chunk_size=4096):
+    '''get the daily returns of the stocks
+
+    Parameters
+    ------------------
+    df: pandas.DataFrame
+        A pandas DataFrame of the Adjusted close of your desired stocks
+    dtype: str, optional
+        Storage dtype of the returns, e.g. 'float32' to halve the memory of a large
+        panel (get_statistical_summary still accumulates in float64). The returns are
+        computed in float64 chunks of rows written into the compact panel, so no
+        float64 panel of the whole returns is created
+    chunk_size: int
+        Number of rows computed in float64 at once when dtype is given
+
+
+    Return
+    -------------------
+
+    returns: pandas.DataFrame
+        A Pandas DataFrame of the daily returns, the first row is NaN'''
+
+    if dtype is None:
+        return df.pct_change()
+
+    values = df.to_numpy()
+    returns = np.empty(values.shape, dtype=dtype)
+    # Last price of each stock before the chunk, forward filled across the chunks as pct_change does
+    previous = np.full((1, values.shape[1]), np.nan)
+    for start in range(0, len(values), chunk_size):
+        chunk = np.vstack((previous, values[start:start + chunk_size].astype(np.float64)))
+        prices = pd.DataFrame(chunk).ffill().to_numpy()
+        returns[start:start + chunk_size] = prices[1:] / prices[:-1] - 1
+        previous = prices[-1:]
+
+    return pd.DataFrame(returns, index=df.index, columns=df.columns)
+
+
+def get_float64_moments(returns, chunk_size=4096):
+    '''get the mean, covariance, correlation and std of returns stored in a compact dtype
+
+    The returns are read in chunks of rows converted to float64, so the sums are
+    accumulated in float64 while the whole panel stays in its own dtype (e.g. float32).
+    Missing values are handled pairwise, as returns.cov() and returns.corr() do.
+
+    Parameters
+    ------------------
+    returns: pandas.DataFrame
+        The daily returns, e.g. from get_daily_returns with dtype='float32'
+    chunk_size: int
+        Number of rows converted to float64 at once
+
+
+    Return
+    -------------------
+
+    meanreturns, cov, corr, std: float64 pandas objects, as in get_statistical_summary'''
+
+    columns = returns.columns
+    n = len(columns)
+    counts = np.zeros((n, n))     # rows where both i and j are present
+    sums = np.zeros((n, n))       # sum of x_i over those rows
+    squares = np.zeros((n, n))    # sum of x_i**2 over those rows
+    products = np.zeros((n, n))   # sum of x_i * x_j over those rows
+
+    values = returns.to_numpy()
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size].astype(np.float64)
+        present = np.isfinite(chunk)
+        chunk = np.where(present, chunk, 0.0)
+        present = present.astype(np.float64)
+        counts += present.T @ present
+        sums += chunk.T @ present
+        squares += (chunk * chunk).T @ present
+        products += chunk.T @ chunk
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (products - sums * sums.T / counts) / (counts - 1)
+        variances = (squares - sums * sums / counts) / (counts - 1)
+        corr = cov / np.sqrt(variances * variances.T)
+        diagonal = np.diag(counts)
+        meanreturns = np.diag(sums) / diagonal
+        std = np.sqrt(np.diag(variances))
+
+    return (pd.Series(meanreturns, index=columns), pd.DataFrame(cov, index=columns, columns=columns),
+            pd.DataFrame(corr, index=columns, columns=columns), pd.Series(std, index=columns))
+
+
+def get_statistical_summary(df, returns=None):
     '''get the return and the covariance matriex of stock returns
 
     Parameters
     ------------------
     df: pandas.DataFrame
         A pandas DataFrame of the Adjusted close of your desired stocks
+    returns: pandas.DataFrame, optional
+        The daily returns from get_daily_returns, pass it to reuse the same
+        returns in other steps (e.g. the CVaR scenarios) instead of recomputing them
 
 
     Return
@@ -45,15 +235,20 @@ def get_statistical_summary(df):
         A covariance matrix of the stocks'''
 
     # calculate the returns os the stock
-    returns = df.pct_change()
-    # calculate the mean of returns
-    meanreturns = returns.mean()
-    # calculate the covariance matrix
-    cov = returns.cov()
-
-    corr=returns.corr()
-
-    std=returns.std()
+    if returns is None:
+        returns = get_daily_returns(df)
+    if (returns.dtypes == np.float32).all():
+        # Compact returns panel, the statistics are still accumulated in float64
+        meanreturns, cov, corr, std = get_float64_moments(returns)
+    else:
+        # calculate the mean of returns
+        meanreturns = returns.mean()
+        # calculate the covariance matrix
+        cov = returns.cov()
+
+        corr=returns.corr()
+
+        std=returns.std()
 
     annualized_return = (1 + meanreturns)**252 - 1
 
@@ -1,45 +1,9 @@
-import plotly.express as px
 import plotly.graph_objects as go
+from portfolio_optimizer.downsampling import downsampled_line_data
+from portfolio_optimizer.figure_style import color_map, hover_template
 
 
-def color_map():
-    """
-    Returns a list of professional hex colors for line chart color mapping.
-    
-    Returns:
-    ---------------------
-    professional_hex_colors : list
-        List of professional hex colors.
-    """
-    professional_hex_colors = [
-    '#1f77b4', '#aec7e8', '#ff7f0e', '#ffbb78', '#2ca02c',
-    '#98df8a', '#d62728', '#ff9896', '#9467bd', '#c5b0d5',
-    '#8c564b', '#c49c94', '#e377c2', '#f7b6d2', '#7f7f7f',
-    '#c7c7c7', '#bcbd22', '#dbdb8d', '#17becf', '#9edae5',
-    '#5254a3', '#8c6d31', '#9c9ede', '#d3d3d3', '#d6616b',
-    '#e6550d', '#fdd0a2', '#e7ba52', '#31a354', '#74c476',
-    '#a1d99b', '#756bb1', '#bcbddc', '#969696', '#6baed6',
-    '#c6dbef', '#9ecae1', '#6b6ecf', '#e377c2', '#f7b6d2',
-    '#7b4173', '#a55194', '#ce6dbd', '#de9ed6', '#8c6d31',
-    '#bd9e39', '#e7ba52', '#ad494a', '#d6616b', '#91003f'
-    ]
-    return professional_hex_colors
-
-   
-def hover_template():
-    """
-    Define the hover template for hover tooltips.
-
-    Returns:
-    ----------------
-    template : str
-        Hover template with placeholders.
-    """
-    template = 'Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}<br>Sharpe Ratio: %{text}<extra></extra>'
-    return template
-
-
-def plot_stocks_line_chart(data):
+def plot_stocks_line_chart(data, max_points=None):
     """
     Plot a line chart for stocks' adjusted close prices.
     
@@ -47,6 +11,9 @@ def plot_stocks_line_chart(data):
     ---------------------
     data : pandas.DataFrame
         DataFrame containing stocks' adjusted close prices with dates as the index and stock symbols as columns.
+    max_points : int, optional
+        When given, the chart uses WebGL traces and every stock is downsampled to at most
+        max_points points with LTTB. By default every price is drawn as SVG.
         
     Returns:
     ---------------------
@@ -71,12 +38,21 @@ def plot_stocks_line_chart(data):
         color="black",
     )
 
-    # Create a line chart with Plotly Express
-    stock_line_chart = px.line(data,
-                               x=data.index,
-                               y=data.columns,
-                               color_discrete_sequence=color_map()
-                               )
+    if max_points is None:
+        # Create a line chart with Plotly Express, only needed for the full resolution chart
+        import plotly.express as px
+        stock_line_chart = px.line(data,
+                                   x=data.index,
+                                   y=data.columns,
+                                   color_discrete_sequence=color_map()
+                                   )
+    else:
+        # Create a WebGL line per stock from the downsampled prices
+        colors = color_map()
+        stock_line_chart = go.Figure(data=[
+            go.Scattergl(name=symbol, x=dates, y=prices, mode='lines', line=dict(color=colors[i % len(colors)]))
+            for i, (symbol, dates, prices) in enumerate(downsampled_line_data(data, max_points))
+        ])
 
     # Update layout settings
     stock_line_chart.update_layout(
@@ -139,6 +115,7 @@ def plot_correlation_matrix(corr):
     """
 
     # Create a heatmap plot using Plotly Express
+    import plotly.express as px
     fig = px.imshow(corr,
                     x=corr.index,
                     y=corr.columns,
@@ -231,11 +208,49 @@ def plot_efficient_frontier(Return, STD, Sharpe_Ratio):
     return efficient_frontier_graph
 
 
+def plot_portfolio_density(density):
+    """
+    Plot a random portfolio cloud aggregated by create_portfolio_density as one heatmap.
+
+    Every cell is colored by the best Sharpe ratio of the portfolios it holds, so the
+    size of the trace depends on the number of bins and not on the number of portfolios.
+
+    Parameters:
+    ----------------
+    density : dict
+        Density grid from portfolio_optimizer.portfolio_density.create_portfolio_density.
+
+    Returns:
+    ----------------
+    density_graph : plotly.graph_objs._heatmap.Heatmap
+        Heatmap of the portfolio cloud.
+    """
+    density_graph = go.Heatmap(
+        name='Portfolios',
+        x=density['x'],
+        y=density['y'],
+        z=density['max_sharpe'],
+        customdata=density['counts'],
+        hovertemplate='Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}<br>'
+                      'Max Sharpe Ratio: %{z}<br>Portfolios: %{customdata}<extra></extra>',
+        colorbar=dict(
+            title='Sharpe Ratio',
+            titleside='right',
+            ticks='outside',
+        ),
+        colorscale='YlGnBu',
+        hoverongaps=False,
+        showlegend=True,
+    )
+    return density_graph
+
+
 def efficient_frontier_with_details(
     max_return, max_return_std, max_sharpe_ratio,
     min_volatility_return, min_volatility, min_volatility_sharpe_ratio,
     Return, STD, Sharpe_Ratio,
-    random_portfolios_return, random_portfolios_std, random_portfolios_sharpe_ratio
+    random_portfolios_return, random_portfolios_std, random_portfolios_sharpe_ratio,
+    density=None
 ):
     """
     Create a portfolio optimization plot with Efficient Frontier and key points.
@@ -278,6 +293,10 @@ def efficient_frontier_with_details(
     random_portfolios_sharpe_ratio : list
         List of Sharpe ratios for random portfolios.
 
+    density : dict, optional
+        Density grid of a large random portfolio cloud, plotted as a heatmap
+        instead of the random portfolios markers when given.
+
     Returns:
     ----------------
     figure : plotly.graph_objs._figure.Figure
@@ -317,23 +336,26 @@ def efficient_frontier_with_details(
 
     efficient_frontier = plot_efficient_frontier(Return, STD, Sharpe_Ratio)
 
-    random_portfolios_graph = go.Scatter(
-        name='Portfolios',
-        mode='markers',
-        y=random_portfolios_return,
-        x=random_portfolios_std,
-        text=random_portfolios_sharpe_ratio,
-        hovertemplate=hover_template(),
-        marker=dict(
-            color=random_portfolios_sharpe_ratio,
-            colorbar=dict(
-                title='Sharpe Ratio',
-                titleside='right',
-                ticks='outside',
+    if density is not None:
+        random_portfolios_graph = plot_portfolio_density(density)
+    else:
+        random_portfolios_graph = go.Scatter(
+            name='Portfolios',
+            mode='markers',
+            y=random_portfolios_return,
+            x=random_portfolios_std,
+            text=random_portfolios_sharpe_ratio,
+            hovertemplate=hover_template(),
+            marker=dict(
+                color=random_portfolios_sharpe_ratio,
+                colorbar=dict(
+                    title='Sharpe Ratio',
+                    titleside='right',
+                    ticks='outside',
+                ),
+                colorscale='YlGnBu',
             ),
-            colorscale='YlGnBu',
-        ),
-    )
+        )
 
     figure = go.Figure(
         data=[random_portfolios_graph, efficient_frontier, max_ratio_point, global_minimum],
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+
+def largest_triangle_three_buckets(x, y, threshold):
+    """
+    Downsample a line with the largest-triangle-three-buckets (LTTB) algorithm.
+
+    The points between the first and the last one are split in threshold - 2 buckets.
+    From each bucket LTTB keeps the point forming the largest triangle with the point kept
+    in the previous bucket and the average of the next bucket, which preserves the visual
+    shape (peaks and troughs) of the line.
+
+    Parameters:
+    ---------------------
+    x : np.array
+        Sorted numeric x values (use datetime64 values as int64).
+    y : np.array
+        Y values, without NaN.
+    threshold : int
+        Number of points to keep.
+
+    Returns:
+    ---------------------
+    indices : np.array
+        Sorted indices of the kept points.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]) of the inner points
+    edges = (np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)) + 1).astype(int)
+    edges[-1] = n - 1
+
+    # Average point of every bucket, from cumulative sums; the last point is its own bucket
+    x_sums = np.concatenate(([0.], np.cumsum(x)))
+    y_sums = np.concatenate(([0.], np.cumsum(y)))
+    starts = np.append(edges[:-1], n - 1)
+    ends = np.append(edges[1:], n)
+    x_averages = (x_sums[ends] - x_sums[starts]) / (ends - starts)
+    y_averages = (y_sums[ends] - y_sums[starts]) / (ends - starts)
+
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the triangle areas between the previous point, each candidate and the next average
+        areas = np.abs((x[a] - x_averages[i + 1]) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (y_averages[i + 1] - y[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+def downsample_series(series, threshold):
+    """
+    Downsample a price series with LTTB, dropping the missing values first.
+
+    Parameters:
+    ---------------------
+    series : pandas.Series
+        Series with a DatetimeIndex.
+    threshold : int
+        Number of points to keep.
+
+    Returns:
+    ---------------------
+    downsampled : pandas.Series
+        The kept points.
+    """
+    series = series.dropna()
+    x = series.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    indices = largest_triangle_three_buckets(x, series.to_numpy(), threshold)
+    return series.iloc[indices]
+
+
+def downsampled_line_data(data, max_points):
+    """
+    Downsample every stock of a price DataFrame with LTTB.
+
+    Parameters:
+    ---------------------
+    data : pandas.DataFrame
+        DataFrame containing stocks' adjusted close prices with dates as the index and stock symbols as columns.
+    max_points : int
+        Maximum number of points kept per stock.
+
+    Returns:
+    ---------------------
+    lines : list
+        List of (symbol, dates, prices) tuples, dates as 'YYYY-MM-DD' strings and prices as floats.
+    """
+    lines = []
+    for column in data.columns:
+        series = downsample_series(data[column], max_points)
+        lines.append((column, series.index.strftime('%Y-%m-%d').tolist(), series.to_numpy(dtype=float).tolist()))
+    return lines
@@ -1,13 +1,23 @@
 import pandas as pd
 import numpy as np
-from portfolio_optimizer.data_fetching import get_returns_df, get_statistical_summary
 from portfolio_optimizer.portfolio_optimization import (
     get_max_sharp_ratio, get_minimum_variance,
     get_weights_for_target_return, get_portfolio_performance
 )
+from portfolio_optimizer.portfolio_density import get_portfolios_performance
+from portfolio_optimizer.profiling import profiled
 
 
 
+def __getattr__(name):
+    # get_returns_df and get_statistical_summary used to be imported here, keep them importable
+    if name in ('get_returns_df', 'get_statistical_summary'):
+        from portfolio_optimizer import data_fetching
+        return getattr(data_fetching, name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+@profiled
 def create_efficient_frontier(stock_list, mean_return, cov, risk_free_rate=0, number_of_portfolios=50):
     """
     Generate an efficient frontier of portfolios with varying levels of risk and return.
@@ -71,14 +81,11 @@ def create_efficient_frontier(stock_list, mean_return, cov, risk_free_rate=0, nu
 
 def generate_random_portfolios(columns,num_portfolios,stock_list,mean_return,cov,risk_free_rate=0):
 
-    random_portfolios=pd.DataFrame(columns=columns)
-    for _ in range(num_portfolios):
-        random_weights = np.random.dirichlet(np.ones(len(stock_list)), size=1)
-        Return, std=get_portfolio_performance(random_weights[0],mean_return,cov)
-        sharpe_ratio=(Return-risk_free_rate)/std
-        row=list(random_weights[0])
-        row.extend([Return,std,sharpe_ratio])
-        random_portfolios.loc[len(random_portfolios)]=row
+    # All portfolios are drawn and evaluated at once instead of row by row
+    random_weights = np.random.dirichlet(np.ones(len(stock_list)), size=num_portfolios)
+    Return, std = get_portfolios_performance(random_weights, mean_return, cov)
+    sharpe_ratio = (Return-risk_free_rate)/std
+    random_portfolios = pd.DataFrame(np.column_stack([random_weights, Return, std, sharpe_ratio]), columns=columns)
 
 
     return random_portfolios
@@ -0,0 +1,389 @@
+import json
+import numpy as np
+from portfolio_optimizer.downsampling import downsampled_line_data
+from portfolio_optimizer.figure_style import color_map, hover_template
+from portfolio_optimizer.correlation_clustering import get_block_summary, get_correlation_detail
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# The figures of this module are plain dicts in the plotly figure schema. They skip the
+# property validation of plotly.graph_objects and the default plotly template, which
+# dcc.Graph does not need, and keep numeric data as numpy arrays until serialization.
+
+# Blocks along each axis of the clustered correlation heatmap
+CORRELATION_BLOCKS = 40
+
+
+
+def _values(values):
+    # Array data of a trace: numpy arrays are serialized without a Python list copy
+    return np.ascontiguousarray(values, dtype=float)
+
+
+def _labels(values):
+    return [str(value) for value in values]
+
+
+def frontier_layout(title):
+    """
+    Layout of the efficient frontier figures.
+
+    Parameters:
+    ---------------------
+    title : str
+        Title of the figure.
+
+    Returns:
+    ---------------------
+    layout : dict
+        Plotly layout.
+    """
+    layout = {
+        'title': {'text': title},
+        'xaxis': {'title': {'text': 'Annualized Volatility (%)'}, 'linecolor': 'black'},
+        'yaxis': {'title': {'text': 'Annualized Return (%)'}, 'linecolor': 'black'},
+        'plot_bgcolor': 'white',
+        'paper_bgcolor': 'white',
+        'legend': {'x': 1.3, 'y': 1.1, 'xanchor': 'left', 'bgcolor': '#FFFFE0'},
+    }
+    return layout
+
+
+def single_point(point_name, x_value, y_value, sharpe_ratio=0):
+    """
+    Scatter trace of one highlighted portfolio, as create_single_point_plot.
+
+    Returns:
+    ---------------------
+    point : dict
+        Plotly scatter trace.
+    """
+    point = {
+        'type': 'scatter',
+        'name': point_name,
+        'x': [float(x_value)],
+        'y': [float(y_value)],
+        'mode': 'markers',
+        'marker': {'color': 'blue', 'size': 14, 'line': {'color': 'black', 'width': 2}},
+        'text': [float(sharpe_ratio)],
+        'hovertemplate': f'Name: {point_name}' + '<br>Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}'
+                         '<br>Sharpe Ratio: %{text}<extra></extra>',
+    }
+    return point
+
+
+def efficient_frontier_trace(Return, STD, Sharpe_Ratio):
+    """
+    Line trace of the efficient frontier, as plot_efficient_frontier.
+
+    Returns:
+    ---------------------
+    efficient_frontier : dict
+        Plotly scatter trace.
+    """
+    efficient_frontier = {
+        'type': 'scatter',
+        'name': 'Efficient Frontier',
+        'mode': 'lines',
+        'x': _values(STD),
+        'y': _values(Return),
+        'line': {'color': 'black', 'width': 2},
+        'text': _values(Sharpe_Ratio),
+        'hovertemplate': hover_template(),
+    }
+    return efficient_frontier
+
+
+def fast_stocks_line_chart(data, max_points):
+    """
+    Dict version of plot_stocks_line_chart with WebGL lines downsampled to max_points points per stock.
+
+    Parameters:
+    ---------------------
+    data : pandas.DataFrame
+        DataFrame containing stocks' adjusted close prices with dates as the index and stock symbols as columns.
+    max_points : int
+        Maximum number of points kept per stock.
+
+    Returns:
+    ---------------------
+    stock_line_chart : dict
+        Plotly figure.
+    """
+    colors = color_map()
+    traces = [
+        {'type': 'scattergl', 'name': symbol, 'x': dates, 'y': prices, 'mode': 'lines',
+         'line': {'color': colors[i % len(colors)]}}
+        for i, (symbol, dates, prices) in enumerate(downsampled_line_data(data, max_points))
+    ]
+
+    layout = {
+        'title': {'text': 'Stocks Adj Close price through the period'},
+        'plot_bgcolor': 'white',
+        'paper_bgcolor': 'white',
+        'legend': {'title': {'text': 'Companies Symbols'}, 'bgcolor': '#ECECF0', 'bordercolor': '#ECECF0',
+                   'borderwidth': 0, 'x': 1, 'y': 1},
+        'font': {'family': 'Arial', 'size': 12, 'color': 'black'},
+        'xaxis': {
+            'title': {'text': 'Date'},
+            'showgrid': False,
+            'type': 'date',
+            'rangeselector': {
+                'buttons': [
+                    {'count': 6, 'label': '6m', 'step': 'month', 'stepmode': 'backward'},
+                    {'count': 1, 'label': 'YTD', 'step': 'year', 'stepmode': 'todate'},
+                    {'count': 1, 'label': '1y', 'step': 'year', 'stepmode': 'backward'},
+                    {'count': 2, 'label': '2y', 'step': 'year', 'stepmode': 'backward'},
+                    {'count': 3, 'label': '3y', 'step': 'year', 'stepmode': 'backward'},
+                    {'step': 'all'},
+                ],
+                'bgcolor': 'rgba(0,46,69,0.5)',
+                'font': {'color': 'white'},
+                'x': 0,
+                'y': 1,
+            },
+        },
+        'yaxis': {'title': {'text': 'Adj Close Price'}, 'showgrid': False},
+    }
+
+    return {'data': traces, 'layout': layout}
+
+
+def fast_correlation_matrix(corr):
+    """
+    Dict version of plot_correlation_matrix.
+
+    Parameters:
+    ---------------------
+    corr : pandas.DataFrame
+        The correlation matrix.
+
+    Returns:
+    ---------------------
+    fig : dict
+        Plotly figure.
+    """
+    heatmap = {
+        'type': 'heatmap',
+        'x': _labels(corr.index),
+        'y': _labels(corr.columns),
+        'z': _values(corr),
+        'coloraxis': 'coloraxis',
+        'hovertemplate': 'x: %{x}<br>y: %{y}<br>color: %{z}<extra></extra>',
+    }
+    layout = {
+        'title': {'text': 'Correlation Matrix of Portfolio Assets'},
+        'width': 600,
+        'coloraxis': {'colorscale': 'Blues'},
+        'xaxis': {'constrain': 'domain', 'scaleanchor': 'y'},
+        'yaxis': {'constrain': 'domain', 'autorange': 'reversed'},
+    }
+    return {'data': [heatmap], 'layout': layout}
+
+
+def correlation_view(corr, order, number_of_blocks=CORRELATION_BLOCKS, rows=None, columns=None):
+    """
+    Heatmap data and axis ticks of the clustered correlation matrix.
+
+    The whole matrix is summarized by the mean correlation of blocks of clustered assets.
+    A window of clustered positions is shown cell by cell.
+
+    Parameters:
+    ---------------------
+    corr : pandas.DataFrame
+        The correlation matrix.
+    order : list
+        Asset names in clustered order, from correlation_clustering.cluster_order.
+    number_of_blocks : int, optional
+        Blocks along each axis of the summary (default is CORRELATION_BLOCKS).
+    rows : tuple, optional
+        (start, end) positions of the rows of the window, the whole matrix by default.
+    columns : tuple, optional
+        (start, end) positions of the columns of the window.
+
+    Returns:
+    ---------------------
+    view : dict
+        'trace' (heatmap properties), 'xaxis' and 'yaxis' (tick values and labels).
+    """
+    if rows is None or columns is None:
+        summary = get_block_summary(corr, order, number_of_blocks)
+        ticks = {'tickvals': summary['centers'], 'ticktext': summary['labels']}
+        return {
+            'trace': {'x': summary['centers'], 'y': summary['centers'], 'z': summary['z'],
+                      'hovertemplate': 'Mean correlation: %{z:.2f}<extra></extra>'},
+            'xaxis': ticks,
+            'yaxis': ticks,
+        }
+
+    detail = get_correlation_detail(corr, order, rows, columns)
+    return {
+        'trace': {'x': detail['x'], 'y': detail['y'], 'z': detail['z'],
+                  'hovertemplate': 'Correlation: %{z:.2f}<extra></extra>'},
+        'xaxis': {'tickvals': detail['x'], 'ticktext': detail['x_labels']},
+        'yaxis': {'tickvals': detail['y'], 'ticktext': detail['y_labels']},
+    }
+
+
+def fast_clustered_correlation_matrix(corr, order, number_of_blocks=CORRELATION_BLOCKS):
+    """
+    Correlation heatmap of a large basket: assets in clustered order, summarized by blocks.
+
+    The axes are the clustered positions of the assets, so a zoomed window can be
+    replaced by its cells (see correlation_view) and the payload does not grow as N x N.
+
+    Parameters:
+    ---------------------
+    corr : pandas.DataFrame
+        The correlation matrix.
+    order : list
+        Asset names in clustered order, from correlation_clustering.cluster_order.
+    number_of_blocks : int, optional
+        Blocks along each axis of the summary (default is CORRELATION_BLOCKS).
+
+    Returns:
+    ---------------------
+    fig : dict
+        Plotly figure.
+    """
+    view = correlation_view(corr, order, number_of_blocks)
+    heatmap = dict({'type': 'heatmap', 'coloraxis': 'coloraxis'}, **view['trace'])
+    layout = {
+        'title': {'text': 'Correlation Matrix of Portfolio Assets (clustered, zoom for details)'},
+        'width': 800,
+        'height': 800,
+        'coloraxis': {'colorscale': 'Blues'},
+        'xaxis': dict({'constrain': 'domain', 'scaleanchor': 'y', 'tickangle': 45}, **view['xaxis']),
+        'yaxis': dict({'constrain': 'domain', 'autorange': 'reversed'}, **view['yaxis']),
+    }
+    return {'data': [heatmap], 'layout': layout}
+
+
+def fast_efficient_frontier_with_details(
+    max_return, max_return_std, max_sharpe_ratio,
+    min_volatility_return, min_volatility, min_volatility_sharpe_ratio,
+    Return, STD, Sharpe_Ratio,
+    random_portfolios_return, random_portfolios_std, random_portfolios_sharpe_ratio,
+    density=None
+):
+    """
+    Dict version of efficient_frontier_with_details, with the same parameters.
+
+    Returns:
+    ---------------------
+    figure : dict
+        Plotly figure.
+    """
+    colorbar = {'title': {'text': 'Sharpe Ratio', 'side': 'right'}, 'ticks': 'outside'}
+    if density is not None:
+        random_portfolios_graph = {
+            'type': 'heatmap',
+            'name': 'Portfolios',
+            'x': _values(density['x']),
+            'y': _values(density['y']),
+            'z': _values(density['max_sharpe']),
+            # Portfolios of each cell, then the volatility and return of its best portfolio,
+            # from which the browser recomputes the Sharpe ratios for another risk-free rate
+            'customdata': np.dstack([density['counts'], density['best_std'], density['best_return']]),
+            'hovertemplate': 'Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}<br>'
+                             'Max Sharpe Ratio: %{z}<br>Portfolios: %{customdata[0]}<extra></extra>',
+            'colorbar': colorbar,
+            'colorscale': 'YlGnBu',
+            'hoverongaps': False,
+            'showlegend': True,
+        }
+    else:
+        random_portfolios_graph = {
+            'type': 'scatter',
+            'name': 'Portfolios',
+            'mode': 'markers',
+            'x': _values(random_portfolios_std),
+            'y': _values(random_portfolios_return),
+            'text': _values(random_portfolios_sharpe_ratio),
+            'hovertemplate': hover_template(),
+            'marker': {'color': _values(random_portfolios_sharpe_ratio), 'colorbar': colorbar, 'colorscale': 'YlGnBu'},
+        }
+
+    data = [
+        random_portfolios_graph,
+        efficient_frontier_trace(Return, STD, Sharpe_Ratio),
+        single_point('Maximum Sharpe Ratio', max_return_std, max_return, max_sharpe_ratio),
+        single_point('Global Minimum', min_volatility, min_volatility_return, min_volatility_sharpe_ratio),
+    ]
+
+    return {'data': data, 'layout': frontier_layout('Portfolio Optimization with Efficient Frontier')}
+
+
+def fast_stocks_vs_portfolio(max_return, max_return_std, max_sharpe_ratio,
+    min_volatility_return, min_volatility, min_volatility_sharpe_ratio,
+    Return, STD, Sharpe_Ratio, annualized_return, annualized_risk):
+    """
+    Dict version of plot_stocks_vs_portfolio, with the same parameters.
+
+    The stocks are drawn as one labelled marker trace instead of one trace per stock.
+
+    Returns:
+    ---------------------
+    figure : dict
+        Plotly figure.
+    """
+    symbols = _labels(annualized_return.index)
+    annualized_return = _values(annualized_return)
+    annualized_risk = _values(annualized_risk)
+
+    stocks = {
+        'type': 'scatter',
+        'name': 'Stocks',
+        'mode': 'markers+text',
+        'x': annualized_risk,
+        'y': annualized_return,
+        'text': symbols,
+        'customdata': annualized_return / annualized_risk,
+        'textposition': 'top center',
+        'marker': {'color': 'red'},
+        'hovertemplate': 'Name: %{text}<br>Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}'
+                         '<br>Sharpe Ratio: %{customdata}<extra></extra>',
+    }
+
+    data = [
+        stocks,
+        efficient_frontier_trace(Return, STD, Sharpe_Ratio),
+        single_point('Maximum Sharpe Ratio', max_return_std, max_return, max_sharpe_ratio),
+        single_point('Global Minimum', min_volatility, min_volatility_return, min_volatility_sharpe_ratio),
+    ]
+
+    return {'data': data, 'layout': frontier_layout('Portfolio Optimization with Individual Stocks')}
+
+
+def _json_default(value):
+    # Fallback encoder: arrays become lists, NaN becomes null as in the plotly encoder
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return np.where(np.isnan(value), None, value.astype(object)).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+def figure_to_json(figure):
+    """
+    Serialize a dict figure, with orjson when it is installed.
+
+    Parameters:
+    ---------------------
+    figure : dict
+        Plotly figure.
+
+    Returns:
+    ---------------------
+    payload : bytes
+        JSON of the figure.
+    """
+    if orjson is not None:
+        return orjson.dumps(figure, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(figure, default=_json_default, separators=(',', ':')).encode()
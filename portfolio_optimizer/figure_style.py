@@ -0,0 +1,35 @@
+def color_map():
+    """
+    Returns a list of professional hex colors for line chart color mapping.
+    
+    Returns:
+    ---------------------
+    professional_hex_colors : list
+        List of professional hex colors.
+    """
+    professional_hex_colors = [
+    '#1f77b4', '#aec7e8', '#ff7f0e', '#ffbb78', '#2ca02c',
+    '#98df8a', '#d62728', '#ff9896', '#9467bd', '#c5b0d5',
+    '#8c564b', '#c49c94', '#e377c2', '#f7b6d2', '#7f7f7f',
+    '#c7c7c7', '#bcbd22', '#dbdb8d', '#17becf', '#9edae5',
+    '#5254a3', '#8c6d31', '#9c9ede', '#d3d3d3', '#d6616b',
+    '#e6550d', '#fdd0a2', '#e7ba52', '#31a354', '#74c476',
+    '#a1d99b', '#756bb1', '#bcbddc', '#969696', '#6baed6',
+    '#c6dbef', '#9ecae1', '#6b6ecf', '#e377c2', '#f7b6d2',
+    '#7b4173', '#a55194', '#ce6dbd', '#de9ed6', '#8c6d31',
+    '#bd9e39', '#e7ba52', '#ad494a', '#d6616b', '#91003f'
+    ]
+    return professional_hex_colors
+
+   
+def hover_template():
+    """
+    Define the hover template for hover tooltips.
+
+    Returns:
+    ----------------
+    template : str
+        Hover template with placeholders.
+    """
+    template = 'Annualized Return (%): %{y}<br>Annualized Volatility (%): %{x}<br>Sharpe Ratio: %{text}<extra></extra>'
+    return template
@@ -0,0 +1,211 @@
+import numpy as np
+from portfolio_optimizer.portfolio_optimization import (
+    get_weights_for_target_return, get_portfolio_performance
+)
+
+
+# Return improvements below this are solver noise, e.g. the frontier targets above the
+# best asset return all collapse onto the maximum return portfolio
+FRONTIER_TOLERANCE = 1e-6
+
+
+
+def build_frontier_index(efficient_frontier_data, stock_list):
+    """
+    Build a lookup index from a computed efficient frontier.
+
+    The frontier portfolios are sorted by standard deviation and only the efficient
+    part (return increasing with risk by more than FRONTIER_TOLERANCE) is kept, so both
+    the standard deviation and the return columns of the index are sorted and can be
+    binary searched, and portfolios that only differ by solver noise are indexed once.
+
+    Parameters:
+    ---------------------
+    efficient_frontier_data : pd.DataFrame
+        Output of create_efficient_frontier.
+    stock_list : list
+        List of stock symbols or names in the portfolio.
+
+    Returns:
+    ---------------------
+    frontier_index : dict
+        Dictionary with the 'Stocks', 'Std', 'Return' and 'Weights' of the indexed portfolios.
+    """
+
+    frontier = efficient_frontier_data.sort_values('Std', kind='stable')
+    stds = frontier['Std'].to_numpy(dtype=float)
+    returns = frontier['Return'].to_numpy(dtype=float)
+    weights = frontier[stock_list].to_numpy(dtype=float)
+
+    # Failed solves are dropped first, a NaN would stop the running maximum
+    finite = np.isfinite(stds) & np.isfinite(returns)
+    stds, returns, weights = stds[finite], returns[finite], weights[finite]
+
+    # Keep only the points that improve on every less risky point by more than the tolerance
+    previous_best = np.concatenate(([-np.inf], np.maximum.accumulate(returns)[:-1]))
+    efficient = returns > previous_best + FRONTIER_TOLERANCE
+
+    frontier_index = {
+        'Stocks': list(stock_list),
+        'Std': stds[efficient],
+        'Return': returns[efficient],
+        'Weights': weights[efficient],
+    }
+
+    return frontier_index
+
+
+def frontier_index_to_dict(frontier_index):
+    """
+    Convert a frontier index to plain lists so it can be stored in a dcc.Store.
+
+    Parameters:
+    ---------------------
+    frontier_index : dict
+        Output of build_frontier_index.
+
+    Returns:
+    ---------------------
+    data : dict
+        JSON serializable copy of the index.
+    """
+    return {key: np.asarray(value).tolist() for key, value in frontier_index.items()}
+
+
+def _interpolate(frontier_index, key, target):
+    values = np.asarray(frontier_index[key], dtype=float)
+    i = max(int(np.searchsorted(values, target)), 1) if len(values) > 1 and target >= values[0] else 0
+    if i == 0 or i == len(values):
+        return None
+
+    # Blend the two surrounding frontier portfolios
+    t = (target - values[i - 1]) / (values[i] - values[i - 1])
+    weights = np.asarray(frontier_index['Weights'], dtype=float)
+    stds = np.asarray(frontier_index['Std'], dtype=float)
+    returns = np.asarray(frontier_index['Return'], dtype=float)
+
+    portfolio_weights = (1 - t) * weights[i - 1] + t * weights[i]
+    portfolio_return = (1 - t) * returns[i - 1] + t * returns[i]
+    portfolio_std = (1 - t) * stds[i - 1] + t * stds[i]
+
+    return portfolio_return, portfolio_std, portfolio_weights
+
+
+def _nearest(frontier_index, key, target):
+    values = np.asarray(frontier_index[key], dtype=float)
+    i = 0 if target <= values[0] else len(values) - 1
+    return (frontier_index['Return'][i], frontier_index['Std'][i],
+            np.asarray(frontier_index['Weights'][i], dtype=float))
+
+
+def get_weights_for_std_from_index(frontier_index, std_target):
+    """
+    Look up the frontier portfolio for a target standard deviation.
+
+    Targets inside the indexed range are answered by binary search and linear interpolation
+    between the two neighbouring portfolios. Targets outside of it get the closest end of
+    the frontier: no portfolio is less risky than the minimum variance one, and none of
+    the riskier portfolios has a higher return than the riskiest frontier portfolio.
+
+    Parameters:
+    ---------------------
+    frontier_index : dict
+        Output of build_frontier_index (or frontier_index_to_dict).
+    std_target : float
+        Target annualized portfolio standard deviation.
+
+    Returns:
+    ---------------------
+    portfolio_return : float
+        Annualized return of the portfolio.
+    portfolio_std : float
+        Annualized standard deviation of the portfolio.
+    weights : np.array
+        Portfolio weights.
+    """
+
+    portfolio = _interpolate(frontier_index, 'Std', std_target)
+    if portfolio is None:
+        portfolio = _nearest(frontier_index, 'Std', std_target)
+
+    return portfolio
+
+
+def get_weights_for_return_from_index(frontier_index, return_target, mean_return=None, cov=None):
+    """
+    Look up the frontier portfolio for a target return.
+
+    Targets inside the indexed range are answered by binary search and linear interpolation
+    between the two neighbouring portfolios. Targets outside of it are solved with
+    get_weights_for_target_return when mean_return and cov are given, otherwise the
+    closest end of the frontier is returned.
+
+    Parameters:
+    ---------------------
+    frontier_index : dict
+        Output of build_frontier_index (or frontier_index_to_dict).
+    return_target : float
+        Target annualized portfolio return.
+    mean_return : np.array, optional
+        Mean return for each asset, used by the fallback solve.
+    cov : np.array, optional
+        Covariance matrix of asset returns, used by the fallback solve.
+
+    Returns:
+    ---------------------
+    portfolio_return : float
+        Annualized return of the portfolio.
+    portfolio_std : float
+        Annualized standard deviation of the portfolio.
+    weights : np.array
+        Portfolio weights.
+    """
+
+    portfolio = _interpolate(frontier_index, 'Return', return_target)
+    if portfolio is not None:
+        return portfolio
+
+    if mean_return is None or cov is None:
+        return _nearest(frontier_index, 'Return', return_target)
+
+    _, weights = get_weights_for_target_return(mean_return, cov, return_target)
+    portfolio_return, portfolio_std = get_portfolio_performance(weights, mean_return, cov)
+
+    return portfolio_return, portfolio_std, weights
+
+
+def get_tangency_portfolios(frontier_index, risk_free_rates):
+    """
+    Find the maximum Sharpe ratio (tangency) frontier portfolio for many risk-free rates at once.
+
+    For every rate the Sharpe ratio of all the indexed portfolios is evaluated in one
+    matrix and the best one is kept, so no optimization is solved.
+
+    Parameters:
+    ---------------------
+    frontier_index : dict
+        Output of build_frontier_index (or frontier_index_to_dict).
+    risk_free_rates : np.array
+        Annualized risk-free rates, sorted.
+
+    Returns:
+    ---------------------
+    tangency : dict
+        Dictionary with the 'Rate', 'Return', 'Std' and 'Sharpe Ratio' of the tangency portfolio for every rate.
+    """
+
+    rates = np.asarray(risk_free_rates, dtype=float)
+    stds = np.asarray(frontier_index['Std'], dtype=float)
+    returns = np.asarray(frontier_index['Return'], dtype=float)
+
+    sharpe_ratios = (returns[None, :] - rates[:, None]) / stds[None, :]
+    best = np.argmax(sharpe_ratios, axis=1)
+
+    tangency = {
+        'Rate': rates.tolist(),
+        'Return': returns[best].tolist(),
+        'Std': stds[best].tolist(),
+        'Sharpe Ratio': sharpe_ratios[np.arange(len(rates)), best].tolist(),
+    }
+
+    return tangency
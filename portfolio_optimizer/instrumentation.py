@@ -0,0 +1,218 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+_stages = {}
+_solvers = {}
+_caches = {}
+_local = threading.local()
+
+
+
+def reset_metrics():
+    """
+    Clear every recorded metric.
+    """
+    with _lock:
+        _stages.clear()
+        _solvers.clear()
+        _caches.clear()
+
+
+def _current_trace():
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def collect_trace():
+    """
+    Collect the stages, solver counts and cache lookups recorded by the current thread inside the block.
+
+    Yields:
+    ---------------------
+    trace : dict
+        Dictionary with the 'stages' list of (name, seconds) pairs, the 'reused' list of
+        memoized stage names and the 'solvers' and 'cache' counts, filled while the block runs.
+    """
+    previous = _current_trace()
+    trace = {'stages': [], 'reused': [], 'solvers': {}, 'cache': {}}
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+def record_stage(name, seconds):
+    """
+    Record the duration of a pipeline stage.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the stage.
+    seconds : float
+        Duration of the stage.
+    """
+    with _lock:
+        stage = _stages.setdefault(name, {'count': 0, 'sum': 0., 'buckets': [0] * len(DURATION_BUCKETS)})
+        stage['count'] += 1
+        stage['sum'] += seconds
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                stage['buckets'][i] += 1
+
+    trace = _current_trace()
+    if trace is not None:
+        trace['stages'].append((name, seconds))
+
+
+@contextmanager
+def stage_timer(name):
+    """
+    Time the block as a pipeline stage.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the stage.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_reused_stage(name):
+    """
+    Record a pipeline stage whose memoized value was reused instead of evaluating it.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the stage.
+    """
+    trace = _current_trace()
+    if trace is not None:
+        trace['reused'].append(name)
+
+
+def record_solver(name, results):
+    """
+    Record the iterations and function evaluations of a scipy.optimize result.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the optimizer function.
+    results : scipy.optimize.OptimizeResult
+        Result returned by the solver.
+    """
+    iterations = int(results.get('nit', 0))
+    function_evaluations = int(results.get('nfev', 0))
+
+    with _lock:
+        solver = _solvers.setdefault(name, {'calls': 0, 'iterations': 0, 'function_evaluations': 0})
+        solver['calls'] += 1
+        solver['iterations'] += iterations
+        solver['function_evaluations'] += function_evaluations
+
+    trace = _current_trace()
+    if trace is not None:
+        solver = trace['solvers'].setdefault(name, {'calls': 0, 'iterations': 0, 'function_evaluations': 0})
+        solver['calls'] += 1
+        solver['iterations'] += iterations
+        solver['function_evaluations'] += function_evaluations
+
+
+def record_cache(name, hit):
+    """
+    Record a cache lookup.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the cache.
+    hit : bool
+        Whether the lookup found the value.
+    """
+    key = 'hits' if hit else 'misses'
+    with _lock:
+        cache = _caches.setdefault(name, {'hits': 0, 'misses': 0})
+        cache[key] += 1
+
+    trace = _current_trace()
+    if trace is not None:
+        cache = trace['cache'].setdefault(name, {'hits': 0, 'misses': 0})
+        cache[key] += 1
+
+
+def render_prometheus():
+    """
+    Render the recorded metrics in the Prometheus text exposition format.
+
+    Returns:
+    ---------------------
+    text : str
+        The metrics page.
+    """
+    with _lock:
+        stages = {name: dict(stage, buckets=list(stage['buckets'])) for name, stage in _stages.items()}
+        solvers = {name: dict(solver) for name, solver in _solvers.items()}
+        caches = {name: dict(cache) for name, cache in _caches.items()}
+
+    lines = [
+        '# HELP portfolio_stage_duration_seconds Duration of the optimization pipeline stages.',
+        '# TYPE portfolio_stage_duration_seconds histogram',
+    ]
+    for name, stage in sorted(stages.items()):
+        for bound, count in zip(DURATION_BUCKETS, stage['buckets']):
+            lines.append('portfolio_stage_duration_seconds_bucket{{stage="{}",le="{}"}} {}'.format(name, bound, count))
+        lines.append('portfolio_stage_duration_seconds_bucket{{stage="{}",le="+Inf"}} {}'.format(name, stage['count']))
+        lines.append('portfolio_stage_duration_seconds_sum{{stage="{}"}} {}'.format(name, stage['sum']))
+        lines.append('portfolio_stage_duration_seconds_count{{stage="{}"}} {}'.format(name, stage['count']))
+
+    for metric, description in (('calls', 'Number of solver runs.'),
+                                ('iterations', 'Number of solver iterations.'),
+                                ('function_evaluations', 'Number of objective function evaluations.')):
+        lines.append('# HELP portfolio_solver_{}_total {}'.format(metric, description))
+        lines.append('# TYPE portfolio_solver_{}_total counter'.format(metric))
+        for name, solver in sorted(solvers.items()):
+            lines.append('portfolio_solver_{}_total{{solver="{}"}} {}'.format(metric, name, solver[metric]))
+
+    for metric in ('hits', 'misses'):
+        lines.append('# HELP portfolio_cache_{}_total Number of cache {}.'.format(metric, metric))
+        lines.append('# TYPE portfolio_cache_{}_total counter'.format(metric))
+        for name, cache in sorted(caches.items()):
+            lines.append('portfolio_cache_{}_total{{cache="{}"}} {}'.format(metric, name, cache[metric]))
+
+    return '\n'.join(lines) + '\n'
+
+
+def format_trace(trace):
+    """
+    Format a trace from collect_trace as a short text report.
+
+    Parameters:
+    ---------------------
+    trace : dict
+        Trace collected by collect_trace.
+
+    Returns:
+    ---------------------
+    text : str
+        One line per evaluated stage, reused stage, solver and cache.
+    """
+    lines = ['{:<24} {:9.1f} ms'.format(name, seconds * 1000) for name, seconds in trace['stages']]
+    lines.extend('{:<24}    reused'.format(name) for name in trace.get('reused', []))
+    for name, solver in trace['solvers'].items():
+        lines.append('{:<24} {calls} solves, {iterations} iterations, {function_evaluations} evaluations'.format(name, **solver))
+    for name, cache in trace['cache'].items():
+        lines.append('{:<24} {hits} cache hits, {misses} misses'.format(name, **cache))
+    return '\n'.join(lines)
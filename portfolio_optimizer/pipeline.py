@@ -0,0 +1,188 @@
+import os
+from portfolio_optimizer.data_fetching import get_returns_df, get_daily_returns, get_statistical_summary, get_price_epoch
+from portfolio_optimizer.efficient_frontier import create_efficient_frontier, generate_random_portfolios, create_optimal_points
+from portfolio_optimizer.portfolio_density import create_portfolio_density
+from portfolio_optimizer.portfolio_optimization import get_max_sharp_ratio, get_portfolio_performance, get_minimum_variance
+from portfolio_optimizer.pipeline_graph import pipeline_stage, evaluate_graph
+
+
+
+def fetch_stage(stock_list, start_date, end_date, provider, price_epoch, returns_dtype):
+    # provider and price_epoch only key the stage, get_returns_df reads them from the environment and the clock.
+    # The prices are kept in the dtype of the returns, so a float32 run holds no float64 panel
+    return get_returns_df(list(stock_list), start_date, end_date, dtype=returns_dtype)
+
+
+def returns_stage(df, returns_dtype):
+    return get_daily_returns(df, dtype=returns_dtype)
+
+
+def statistics_stage(df, returns):
+    return get_statistical_summary(df, returns)
+
+
+def efficient_frontier_stage(statistics, stock_list, number_of_frontier_portfolios):
+    mean_return, cov = statistics[:2]
+    return create_efficient_frontier(list(stock_list), mean_return, cov, number_of_portfolios=number_of_frontier_portfolios)
+
+
+def random_portfolios_stage(statistics, stock_list, number_of_random_portfolios):
+    mean_return, cov = statistics[:2]
+    columns = list(stock_list) + ['Return', 'Std', 'Sharpe Ratio']
+    return generate_random_portfolios(columns, number_of_random_portfolios, list(stock_list), mean_return, cov)
+
+
+def density_stage(statistics, number_of_density_portfolios):
+    if not number_of_density_portfolios:
+        return None
+    mean_return, cov = statistics[:2]
+    return create_portfolio_density(mean_return, cov, number_of_portfolios=number_of_density_portfolios)
+
+
+def optimal_portfolios_stage(statistics, stock_list):
+    mean_return, cov = statistics[:2]
+    max_sharpe_ratio, max_sharpe_ratio_weights = get_max_sharp_ratio(mean_return, cov)
+    max_return, max_return_std = get_portfolio_performance(max_sharpe_ratio_weights, mean_return, cov)
+    min_variance, min_variance_weights = get_minimum_variance(mean_return, cov)
+    min_risk_return, min_std = get_portfolio_performance(min_variance_weights, mean_return, cov)
+
+    # Create optimal points data for the table
+    optimal_points = create_optimal_points(
+        list(stock_list) + ['Return', 'Std', 'Sharpe Ratio'], max_return, max_return_std, max_sharpe_ratio_weights,
+        min_risk_return, min_std, min_variance_weights
+    )
+
+    return {
+        'max_sharpe_ratio': max_sharpe_ratio,
+        'max_sharpe_ratio_weights': max_sharpe_ratio_weights,
+        'max_return': max_return,
+        'max_return_std': max_return_std,
+        'min_variance': min_variance,
+        'min_variance_weights': min_variance_weights,
+        'min_risk_return': min_risk_return,
+        'min_std': min_std,
+        'optimal_points': optimal_points,
+    }
+
+
+# The pipeline as a graph of memoized stages: fetch -> returns -> statistics -> optimizers,
+# frontier, random portfolios and density. Each stage only depends on the parameters it
+# names, e.g. changing the number of frontier portfolios does not fetch the prices again.
+PIPELINE_STAGES = {stage['name']: stage for stage in [
+    pipeline_stage('fetch', fetch_stage, params=('stock_list', 'start_date', 'end_date', 'provider', 'price_epoch', 'returns_dtype')),
+    pipeline_stage('returns', returns_stage, inputs=('fetch',), params=('returns_dtype',)),
+    pipeline_stage('statistics', statistics_stage, inputs=('fetch', 'returns')),
+    pipeline_stage('efficient_frontier', efficient_frontier_stage, inputs=('statistics',),
+                   params=('stock_list', 'number_of_frontier_portfolios'), shared=True),
+    pipeline_stage('random_portfolios', random_portfolios_stage, inputs=('statistics',),
+                   params=('stock_list', 'number_of_random_portfolios'), shared=True),
+    pipeline_stage('portfolio_density', density_stage, inputs=('statistics',),
+                   params=('number_of_density_portfolios',), shared=True),
+    pipeline_stage('optimal_portfolios', optimal_portfolios_stage, inputs=('statistics',),
+                   params=('stock_list',), shared=True),
+]}
+
+
+def pipeline_params(stock_list, start_date=None, end_date=None, number_of_frontier_portfolios=500,
+                    number_of_random_portfolios=2000, number_of_density_portfolios=0, returns_dtype=None):
+    """
+    Parameters of the pipeline graph, see run_optimization_pipeline.
+
+    Returns:
+    ---------------------
+    params : dict
+        Parameters by name, with hashable values.
+    """
+    return {
+        'stock_list': tuple(stock_list),
+        'start_date': start_date,
+        'end_date': end_date,
+        'provider': os.environ.get('PORTFOLIO_PRICE_PROVIDER'),
+        # Without end date the fetch, and every stage after it, is keyed by the period of the prices
+        'price_epoch': get_price_epoch(end_date),
+        'number_of_frontier_portfolios': number_of_frontier_portfolios,
+        'number_of_random_portfolios': number_of_random_portfolios,
+        'number_of_density_portfolios': number_of_density_portfolios,
+        # float32 returns are opted in per call or for the whole server with PORTFOLIO_RETURNS_DTYPE
+        'returns_dtype': returns_dtype or os.environ.get('PORTFOLIO_RETURNS_DTYPE') or None,
+    }
+
+
+def pipeline_results(values):
+    """
+    Flatten the values of the pipeline stages into the results of run_optimization_pipeline.
+
+    Parameters:
+    ---------------------
+    values : dict
+        Values of the PIPELINE_STAGES from evaluate_graph.
+
+    Returns:
+    ---------------------
+    results : dict
+        See run_optimization_pipeline.
+    """
+    mean_return, cov, corr, std, annualized_return, annualized_risk = values['statistics']
+    results = {
+        'df': values['fetch'],
+        'mean_return': mean_return,
+        'cov': cov,
+        'corr': corr,
+        'std': std,
+        'annualized_return': annualized_return,
+        'annualized_risk': annualized_risk,
+        'efficient_frontier_data': values['efficient_frontier'],
+        'random_portfolios': values['random_portfolios'],
+        'density': values['portfolio_density'],
+    }
+    results.update(values['optimal_portfolios'])
+    return results
+
+
+def run_optimization_pipeline(stock_list, start_date=None, end_date=None,
+                              number_of_frontier_portfolios=500, number_of_random_portfolios=2000, number_of_density_portfolios=0,
+                              returns_dtype=None, use_cache=True):
+    """
+    Run the optimization pipeline of the app without building any figure.
+
+    Evaluates the PIPELINE_STAGES graph: fetches the prices, computes the statistical
+    summary, the efficient frontier, the random portfolio cloud and the optimal points.
+    Each evaluated step is timed as a stage of portfolio_optimizer.instrumentation.
+
+    Parameters:
+    ---------------------
+    stock_list : list
+        List of stock symbols in the portfolio.
+    start_date : str, optional
+        Start date in the format (YYYY-MM-DD).
+    end_date : str, optional
+        End date in the format (YYYY-MM-DD).
+    number_of_frontier_portfolios : int, optional
+        Number of portfolios on the efficient frontier (default is 500).
+    number_of_random_portfolios : int, optional
+        Number of random portfolios (default is 2000).
+    number_of_density_portfolios : int, optional
+        Number of random portfolios aggregated in the density grid of
+        portfolio_optimizer.portfolio_density, 0 skips it (default is 0).
+    returns_dtype : str, optional
+        Storage dtype of the prices and the daily returns, 'float32' halves their memory while
+        the statistics are accumulated in float64 (default is the PORTFOLIO_RETURNS_DTYPE
+        environment variable, otherwise float64).
+    use_cache : bool, optional
+        Reuse the stages memoized in this process and, for the expensive ones,
+        in the shared cache, so any worker process answers a repeated request
+        without recomputing it (default is True).
+
+    Returns:
+    ---------------------
+    results : dict
+        Dictionary with the prices ('df'), the statistical summary, the efficient
+        frontier, the random portfolios, the portfolio density ('density', None when skipped),
+        the optimal portfolios and the optimal points table.
+    """
+
+    params = pipeline_params(stock_list, start_date, end_date, number_of_frontier_portfolios,
+                             number_of_random_portfolios, number_of_density_portfolios, returns_dtype)
+    values = evaluate_graph(PIPELINE_STAGES, list(PIPELINE_STAGES), params, use_cache=use_cache)
+
+    return pipeline_results(values)
@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from threading import Lock
+from portfolio_optimizer.instrumentation import stage_timer, record_cache, record_reused_stage
+from portfolio_optimizer.shared_cache import cache_enabled, cache_key, get_cached, set_cached
+
+
+# Stage results kept in memory by evaluate_graph, least recently used evicted first
+STAGE_CACHE_SIZE = 64
+_stage_cache = OrderedDict()
+_stage_cache_lock = Lock()
+
+
+
+def pipeline_stage(name, function, inputs=(), params=(), shared=False):
+    """
+    Declare a stage of a pipeline graph.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the stage, also the name of its timer in portfolio_optimizer.instrumentation.
+    function : callable
+        Called with the values of the input stages, in order, then the parameters as keyword arguments.
+    inputs : tuple, optional
+        Names of the stages whose values the stage uses.
+    params : tuple, optional
+        Names of the pipeline parameters the stage uses, their repr must be stable.
+    shared : bool, optional
+        Also keep the value in the shared disk cache, for the stages worth sharing
+        between the server processes (default is False).
+
+    Returns:
+    ---------------------
+    stage : dict
+        The stage declaration.
+    """
+    return {'name': name, 'function': function, 'inputs': tuple(inputs), 'params': tuple(params), 'shared': shared}
+
+
+def clear_stage_cache():
+    """
+    Forget every stage value kept in memory.
+    """
+    with _stage_cache_lock:
+        _stage_cache.clear()
+
+
+def stage_keys(stages, params):
+    """
+    Compute the key of every stage of a graph without evaluating it.
+
+    The key of a stage hashes its name, the values of its parameters and the keys of
+    its inputs (a Merkle tree), so it changes exactly when something the stage depends
+    on, directly or through its inputs, changes.
+
+    Parameters:
+    ---------------------
+    stages : dict
+        Stage declarations from pipeline_stage, by name.
+    params : dict
+        Values of the pipeline parameters.
+
+    Returns:
+    ---------------------
+    keys : dict
+        Key of every stage, by name.
+    """
+    keys = {}
+
+    def key(name, path=()):
+        if name not in keys:
+            if name in path:
+                raise ValueError('The pipeline graph has a cycle: {}'.format(' -> '.join(path + (name,))))
+            stage = stages[name]
+            keys[name] = cache_key(name, tuple((param, params[param]) for param in stage['params']),
+                                   tuple(key(input_name, path + (name,)) for input_name in stage['inputs']))
+        return keys[name]
+
+    for name in stages:
+        key(name)
+
+    return keys
+
+
+def _lookup(stage, key, use_cache):
+    # Value of a stage from the memory cache, then from the shared cache for shared stages
+    if not use_cache:
+        return False, None
+
+    with _stage_cache_lock:
+        if key in _stage_cache:
+            _stage_cache.move_to_end(key)
+            return True, _stage_cache[key]
+
+    if stage['shared'] and cache_enabled():
+        value = get_cached('stages', key)
+        record_cache('shared_stages', value is not None)
+        if value is not None:
+            _remember(key, value[0])
+            return True, value[0]
+
+    return False, None
+
+
+def _remember(key, value):
+    with _stage_cache_lock:
+        _stage_cache[key] = value
+        _stage_cache.move_to_end(key)
+        while len(_stage_cache) > STAGE_CACHE_SIZE:
+            _stage_cache.popitem(last=False)
+
+
+def lookup_stage(stages, name, params):
+    """
+    Get the memoized value of a stage without evaluating anything.
+
+    Parameters:
+    ---------------------
+    stages : dict
+        Stage declarations from pipeline_stage, by name.
+    name : str
+        Name of the stage.
+    params : dict
+        Values of the pipeline parameters.
+
+    Returns:
+    ---------------------
+    found : bool
+        Whether the value is in the memory cache or, for shared stages, in the shared cache.
+    value : object
+        Value of the stage, None when it is not found.
+    """
+    return _lookup(stages[name], stage_keys(stages, params)[name], True)
+
+
+def evaluate_graph(stages, targets, params, use_cache=True):
+    """
+    Evaluate the target stages of a pipeline graph, reusing every memoized stage.
+
+    Stages are evaluated lazily from the targets: a stage found in the cache is not
+    evaluated and neither are its inputs, unless another stage needs them. Evaluated
+    stages are timed with stage_timer and reused ones are recorded with record_reused_stage,
+    so the trace of portfolio_optimizer.instrumentation shows which stages ran.
+
+    Parameters:
+    ---------------------
+    stages : dict
+        Stage declarations from pipeline_stage, by name.
+    targets : list
+        Names of the stages to evaluate.
+    params : dict
+        Values of the pipeline parameters.
+    use_cache : bool, optional
+        Reuse and remember the stage values (default is True).
+
+    Returns:
+    ---------------------
+    values : dict
+        Value of every target stage, by name.
+    """
+    keys = stage_keys(stages, params)
+    values = {}
+
+    def evaluate(name):
+        if name in values:
+            return values[name]
+
+        stage = stages[name]
+        found, value = _lookup(stage, keys[name], use_cache)
+        record_cache('stages', found)
+        if found:
+            record_reused_stage(name)
+        else:
+            arguments = [evaluate(input_name) for input_name in stage['inputs']]
+            with stage_timer(name):
+                value = stage['function'](*arguments, **{param: params[param] for param in stage['params']})
+            if use_cache:
+                _remember(keys[name], value)
+                if stage['shared']:
+                    # Wrapped so a stage value of None is cached too
+                    set_cached('stages', keys[name], (value,))
+
+        values[name] = value
+        return value
+
+    return {name: evaluate(name) for name in targets}
@@ -0,0 +1,174 @@
+import numpy as np
+
+
+# Bytes of float64 temporaries of one simulated chunk: weights, weights @ cov and their product
+DENSITY_CHUNK_BYTES = 64 * 2**20
+
+
+def get_portfolios_performance(weights, mean_return, cov):
+    """
+    Vectorized get_portfolio_performance for many portfolios at once.
+
+    Parameters:
+    ---------------------
+    weights : np.array
+        Portfolio weights, shape (portfolios, assets).
+    mean_return : np.array
+        Mean return for each asset.
+    cov : np.array
+        Covariance matrix of asset returns.
+
+    Returns:
+    ---------------------
+    p_returns : np.array
+        Annualized return of every portfolio.
+    p_stds : np.array
+        Annualized standard deviation of every portfolio, on the same scale as get_portfolio_performance.
+    """
+    mean_return = np.asarray(mean_return, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+
+    p_returns = weights @ mean_return * 252
+    p_stds = 0.5 * np.sqrt(np.einsum('ij,ij->i', weights @ cov, weights)) * np.sqrt(252)
+
+    return p_returns, p_stds
+
+
+def get_chunk_size(number_of_assets, memory_bytes=DENSITY_CHUNK_BYTES):
+    """
+    Number of portfolios simulated at once so that a chunk fits in a memory budget.
+
+    Parameters:
+    ---------------------
+    number_of_assets : int
+        Number of assets.
+    memory_bytes : int, optional
+        Memory budget of the float64 temporaries of a chunk (default is DENSITY_CHUNK_BYTES).
+
+    Returns:
+    ---------------------
+    chunk_size : int
+        Portfolios per chunk.
+    """
+    return max(1, memory_bytes // (3 * 8 * max(1, number_of_assets)))
+
+
+def simulate_portfolio_cloud(mean_return, cov, number_of_portfolios, risk_free_rate=0, chunk_size=None, rng=None):
+    """
+    Simulate random (Dirichlet) portfolios chunk by chunk.
+
+    Parameters:
+    ---------------------
+    mean_return : np.array
+        Mean return for each asset.
+    cov : np.array
+        Covariance matrix of asset returns.
+    number_of_portfolios : int
+        Number of random portfolios.
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+    chunk_size : int, optional
+        Number of portfolios simulated at once (default is get_chunk_size of the number of assets).
+    rng : np.random.Generator, optional
+        Random generator, a new unseeded one by default.
+
+    Yields:
+    ---------------------
+    chunk : tuple
+        Arrays of the standard deviations, returns and Sharpe ratios of the chunk.
+    """
+    rng = rng or np.random.default_rng()
+    alpha = np.ones(len(mean_return))
+    chunk_size = chunk_size or get_chunk_size(len(mean_return))
+
+    for start in range(0, number_of_portfolios, chunk_size):
+        weights = rng.dirichlet(alpha, size=min(chunk_size, number_of_portfolios - start))
+        p_returns, p_stds = get_portfolios_performance(weights, mean_return, cov)
+        yield p_stds, p_returns, (p_returns - risk_free_rate) / p_stds
+
+
+def create_portfolio_density(mean_return, cov, number_of_portfolios=1000000, bins=150, risk_free_rate=0,
+                             chunk_size=None, seed=None):
+    """
+    Aggregate a large random portfolio cloud into a 2D (volatility, return) grid.
+
+    Each chunk of simulated portfolios is histogrammed and discarded, so memory does
+    not grow with the number of portfolios or of assets. The returns of fully invested
+    long-only portfolios lie between the lowest and the highest asset return and their
+    volatility between 0 and the highest asset volatility, which fixes the grid before simulating.
+
+    Parameters:
+    ---------------------
+    mean_return : np.array
+        Mean return for each asset.
+    cov : np.array
+        Covariance matrix of asset returns.
+    number_of_portfolios : int, optional
+        Number of random portfolios (default is 1000000).
+    bins : int, optional
+        Number of bins along each axis (default is 150).
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+    chunk_size : int, optional
+        Number of portfolios simulated at once (default is get_chunk_size of the number of assets).
+    seed : int, optional
+        Seed of the simulation.
+
+    Returns:
+    ---------------------
+    density : dict
+        'x' (volatility bin centers), 'y' (return bin centers), 'counts' (portfolios per bin),
+        'max_sharpe' (best Sharpe ratio per bin) and 'best_std' and 'best_return' (volatility
+        and return of the portfolio with the best Sharpe ratio of each bin), grids of shape
+        (bins, bins) indexed [return bin, volatility bin], NaN for empty bins.
+    """
+    rng = np.random.default_rng(seed)
+    mean_return = np.asarray(mean_return, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+
+    if number_of_portfolios <= 0:
+        raise ValueError('number_of_portfolios must be positive')
+
+    # Volatility axis from 0 to the riskiest asset, so no simulated portfolio falls outside of it
+    asset_stds = 0.5 * np.sqrt(np.diag(cov)) * np.sqrt(252)
+    x_range = (0., asset_stds.max())
+    y_range = (mean_return.min() * 252, mean_return.max() * 252)
+    x_width = (x_range[1] - x_range[0]) / bins or 1
+    y_width = (y_range[1] - y_range[0]) / bins or 1
+
+    counts = np.zeros(bins * bins, dtype=np.int64)
+    max_sharpe = np.full(bins * bins, -np.inf)
+    best_std = np.full(bins * bins, np.nan)
+    best_return = np.full(bins * bins, np.nan)
+
+    def accumulate(p_stds, p_returns, sharpe_ratios):
+        x_bins = np.clip(((p_stds - x_range[0]) / x_width).astype(np.int64), 0, bins - 1)
+        y_bins = np.clip(((p_returns - y_range[0]) / y_width).astype(np.int64), 0, bins - 1)
+        flat_bins = y_bins * bins + x_bins
+        counts[:] += np.bincount(flat_bins, minlength=bins * bins)
+
+        # Best portfolio of each bin of the chunk: the last one once sorted by bin then Sharpe ratio
+        order = np.lexsort((sharpe_ratios, flat_bins))
+        sorted_bins = flat_bins[order]
+        best = order[np.append(sorted_bins[1:] != sorted_bins[:-1], True)]
+        better = sharpe_ratios[best] > max_sharpe[flat_bins[best]]
+        best, cells = best[better], flat_bins[best[better]]
+        max_sharpe[cells] = sharpe_ratios[best]
+        best_std[cells] = p_stds[best]
+        best_return[cells] = p_returns[best]
+
+    for chunk in simulate_portfolio_cloud(mean_return, cov, number_of_portfolios, risk_free_rate, chunk_size, rng):
+        accumulate(*chunk)
+
+    max_sharpe[counts == 0] = np.nan
+
+    density = {
+        'x': x_range[0] + (np.arange(bins) + 0.5) * x_width,
+        'y': y_range[0] + (np.arange(bins) + 0.5) * y_width,
+        'counts': counts.reshape(bins, bins),
+        'max_sharpe': max_sharpe.reshape(bins, bins),
+        'best_std': best_std.reshape(bins, bins),
+        'best_return': best_return.reshape(bins, bins),
+    }
+
+    return density
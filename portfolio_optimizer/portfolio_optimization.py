@@ -1,9 +1,12 @@
 import numpy as np
-import scipy.optimize as sc
-
+from portfolio_optimizer.instrumentation import record_solver
 
 
 
+def _minimize(*args, **kwargs):
+    # scipy.optimize is slow to import, so the solvers import it on the first solve
+    from scipy.optimize import minimize
+    return minimize(*args, **kwargs)
 
 
 def get_portfolio_performance(weights, mean_return, cov):
@@ -125,9 +128,11 @@ def get_max_sharp_ratio(mean_return, cov, risk_free_rate=0):
     bounds = tuple((0, 1) for asset in range(len(mean_return)))
 
     # Minimize the negative of Sharpe ratio using SLSQP method
-    results = sc.minimize(negative_sharpe_ratio, initial_weights,
+    results = _minimize(negative_sharpe_ratio, initial_weights,
                           args, method='SLSQP', bounds=bounds, constraints=constraints)
 
+    record_solver('get_max_sharp_ratio', results)
+
     # Extract the maximum Sharpe ratio and corresponding weights
     max_sharpe_ratio, weights = -results['fun'], results['x']
 
@@ -166,9 +171,11 @@ def get_minimum_variance(mean_return, cov):
     bounds = tuple((0, 1) for asset in range(len(mean_return)))
 
     # Minimize the portfolio standard deviation using SLSQP method
-    results = sc.minimize(minimum_variance, initial_weights, args,
+    results = _minimize(minimum_variance, initial_weights, args,
                           method='SLSQP', bounds=bounds, constraints=constraints)
 
+    record_solver('get_minimum_variance', results)
+
     # Extract the minimum portfolio variance and corresponding weights
     min_variance, weights = results['fun'], results['x']
 
@@ -219,9 +226,10 @@ def get_weights_for_target_return(mean_return, cov, return_target):
     bounds = tuple((0, 1) for asset in range(len(mean_return)))
     
     # Minimize the portfolio return using SLSQP method
-    results = sc.minimize(portfolioVariance, initial_weights, args,
+    results = _minimize(portfolioVariance, initial_weights, args,
                           method='SLSQP', bounds=bounds, constraints=constraints)
     
+    record_solver('get_weights_for_target_return', results)
     portfolio_return, weights = results['fun'], results['x']
 
     return portfolio_return, weights
@@ -273,9 +281,10 @@ def get_weights_for_target_variance(mean_return, cov, variance_target):
     bounds = tuple((0, 1) for asset in range(len(mean_return)))
     
     # Minimize the portfolio variance using SLSQP method
-    results = sc.minimize(portfolioVariance, initial_weights, args,
+    results = _minimize(portfolioVariance, initial_weights, args,
                           method='SLSQP', bounds=bounds, constraints=constraints)
     
+    record_solver('get_weights_for_target_variance', results)
     portfolio_variance, weights = results['fun'], results['x']
 
     return portfolio_variance, weights
\ No newline at end of file
@@ -0,0 +1,135 @@
+import functools
+import glob
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+
+# Profiles are written to this directory, only the newest PROFILE_KEEP requests are kept
+PROFILE_DIR = os.environ.get('PORTFOLIO_PROFILE_DIR', 'profiles')
+PROFILE_KEEP = 50
+
+# Only one block is profiled at a time, across threads and nested calls
+_profiling_lock = threading.Lock()
+
+
+
+def profiling_enabled():
+    """
+    Whether every request is profiled, set by the PORTFOLIO_PROFILE environment variable.
+    """
+    return bool(os.environ.get('PORTFOLIO_PROFILE'))
+
+
+def _prune(directory):
+    # Group the files by profile name and drop the oldest profiles
+    names = {}
+    for path in glob.glob(os.path.join(directory, '*')):
+        name = os.path.basename(path).split('.')[0]
+        names.setdefault(name, []).append(path)
+    oldest_first = sorted(names.values(), key=lambda paths: min(os.path.getmtime(path) for path in paths))
+    for paths in oldest_first[:-PROFILE_KEEP]:
+        for path in paths:
+            os.remove(path)
+
+
+@contextmanager
+def profile_request(name, directory=None):
+    """
+    Profile the CPU time and the memory allocations of the block.
+
+    Writes, in the profile directory:
+
+    - ``<profile>.prof``: the cProfile statistics, readable with pstats or snakeviz
+    - ``<profile>.txt``: the 40 most expensive functions by cumulative time
+    - ``<profile>.tracemalloc``: the tracemalloc snapshot taken at the end of the block
+    - ``<profile>.memory.txt``: the 40 biggest allocation differences of the block
+
+    Only one block is profiled at a time: a block entered while another one is being
+    profiled (an optimizer called inside a profiled callback, or a concurrent request)
+    runs without profiling and reports no files. That request still runs, and tracemalloc
+    traces the whole process, so the memory reports include the allocations of the
+    requests running in other threads at the same time, as their header says.
+
+    Parameters:
+    ---------------------
+    name : str
+        Name of the profiled request, used as the prefix of the file names.
+    directory : str, optional
+        Output directory (default is PROFILE_DIR).
+
+    Yields:
+    ---------------------
+    report : dict
+        Filled at the end of the block with the 'files' written and the 'seconds' spent.
+    """
+    report = {'files': [], 'seconds': None}
+    if not _profiling_lock.acquire(blocking=False):
+        yield report
+        return
+
+    import cProfile
+    import io
+    import pstats
+
+    directory = directory or PROFILE_DIR
+    profile_name = '{}-{}-{}'.format(name, time.strftime('%Y%m%d-%H%M%S'), uuid.uuid4().hex[:8])
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(25)
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        report['seconds'] = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+        _profiling_lock.release()
+
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, profile_name)
+
+        profiler.dump_stats(base + '.prof')
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(40)
+        with open(base + '.txt', 'w') as file:
+            file.write(summary.getvalue())
+
+        after.dump(base + '.tracemalloc')
+        with open(base + '.memory.txt', 'w') as file:
+            file.write('# Allocations of the whole process during {} ({:.3f}s), including other threads '
+                       'and concurrent requests\n'.format(name, report['seconds']))
+            for statistic in after.compare_to(before, 'lineno')[:40]:
+                file.write('{}\n'.format(statistic))
+
+        report['files'] = [profile_name + extension for extension in ('.prof', '.txt', '.tracemalloc', '.memory.txt')]
+        _prune(directory)
+
+
+def profiled(function):
+    """
+    Profile every call of the decorated function when PORTFOLIO_PROFILE is set at import time.
+
+    When profiling is off the function is returned unchanged, so it adds no overhead.
+    Every call writes profile files, so only decorate entry points such as
+    create_efficient_frontier, not the solvers they call once per target.
+    """
+    if not profiling_enabled():
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with profile_request(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
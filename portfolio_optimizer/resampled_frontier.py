@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from portfolio_optimizer.portfolio_optimization import (
+    get_minimum_variance, get_weights_for_target_return, get_portfolio_performance
+)
+
+
+
+def generate_bootstrap_indices(number_of_observations, number_of_samples, rng):
+    """
+    Draw bootstrap samples as row indices into the returns matrix.
+
+    Parameters:
+    ---------------------
+    number_of_observations : int
+        Number of rows (days) in the returns matrix.
+    number_of_samples : int
+        Number of bootstrap samples to draw.
+    rng : np.random.Generator
+        Random generator used for the draws.
+
+    Returns:
+    ---------------------
+    indices : np.array
+        Array of shape (number_of_samples, number_of_observations) with the sampled row indices.
+    """
+    return rng.integers(0, number_of_observations, size=(number_of_samples, number_of_observations))
+
+
+def get_bootstrap_statistics(returns, indices):
+    """
+    Calculate the mean return and covariance matrix of every bootstrap sample in one batch.
+
+    The samples are not gathered: a bootstrap sample is the returns matrix with each day
+    weighted by the number of times it was drawn, so its moments are weighted moments
+    of the returns matrix and only one (days, assets) temporary is held at a time.
+
+    Parameters:
+    ---------------------
+    returns : np.array
+        Returns matrix of shape (days, assets).
+    indices : np.array
+        Bootstrap row indices of shape (samples, days).
+
+    Returns:
+    ---------------------
+    mean_returns : np.array
+        Mean return of each asset for each sample, shape (samples, assets).
+    covs : np.array
+        Covariance matrix for each sample, shape (samples, assets, assets).
+    """
+
+    number_of_samples, number_of_observations = indices.shape
+
+    # Times each day was drawn in each sample, shape (samples, days)
+    offsets = np.arange(number_of_samples)[:, None] * len(returns)
+    counts = np.bincount((indices + offsets).ravel(), minlength=number_of_samples * len(returns))
+    counts = counts.reshape(number_of_samples, len(returns)).astype(float)
+
+    # Moments around the full-history mean, which keeps the covariance from cancelling out
+    full_mean = returns.mean(axis=0)
+    centered = returns - full_mean
+    mean_offsets = counts @ centered / number_of_observations
+    mean_returns = full_mean + mean_offsets
+
+    # Weighted sample covariance of each bootstrap history
+    covs = np.empty((number_of_samples, returns.shape[1], returns.shape[1]))
+    for i in range(number_of_samples):
+        covs[i] = (centered.T * counts[i]) @ centered
+        covs[i] -= number_of_observations * np.outer(mean_offsets[i], mean_offsets[i])
+    covs /= number_of_observations - 1
+
+    return mean_returns, covs
+
+
+def get_frontier_weights(mean_return, cov, number_of_portfolios=50):
+    """
+    Solve the efficient frontier of one sample and return the weights ordered from minimum risk to maximum return.
+
+    Parameters:
+    ---------------------
+    mean_return : np.array
+        Mean return for each asset.
+    cov : np.array
+        Covariance matrix of asset returns.
+    number_of_portfolios : int, optional
+        Number of portfolios on the frontier (default is 50).
+
+    Returns:
+    ---------------------
+    weights : np.array
+        Array of shape (number_of_portfolios, assets) with the frontier weights.
+    """
+
+    # The frontier runs from the global minimum variance portfolio up to the best single asset
+    min_variance, min_variance_weights = get_minimum_variance(mean_return, cov)
+    min_risk_return, _ = get_portfolio_performance(min_variance_weights, mean_return, cov)
+    max_return = np.max(mean_return) * 252
+
+    target_returns = np.linspace(min_risk_return, max(min_risk_return, max_return), number_of_portfolios)
+
+    weights = np.empty((number_of_portfolios, len(mean_return)))
+    weights[0] = min_variance_weights
+    for i, target_return in enumerate(target_returns[1:], start=1):
+        _, weights[i] = get_weights_for_target_return(mean_return, cov, target_return)
+
+    return weights
+
+
+def create_resampled_frontier(stock_list, df, number_of_samples=100, number_of_portfolios=50,
+                              risk_free_rate=0, seed=None, batch_size=16, max_workers=None):
+    """
+    Generate a Michaud resampled efficient frontier from bootstrapped return histories.
+
+    Each bootstrap sample is a resampling (with replacement) of the daily returns. A frontier is
+    solved for every sample and the weights are averaged by rank along the frontier. Samples are
+    processed in batches of ``batch_size``: a batch holds its draws and the statistics of its
+    samples, about batch_size * (2 * days + assets ** 2) numbers, and one (days, assets)
+    temporary, whatever ``number_of_samples``.
+
+    Parameters:
+    ---------------------
+    stock_list : list
+        List of stock symbols or names in the portfolio.
+    df : pandas.DataFrame
+        A pandas DataFrame of the Adjusted close of your desired stocks.
+    number_of_samples : int, optional
+        Number of bootstrap samples (default is 100).
+    number_of_portfolios : int, optional
+        Number of portfolios on the frontier (default is 50).
+    risk_free_rate : float, optional
+        Risk-free rate (default is 0).
+    seed : int, optional
+        Seed of the bootstrap draws, the result is reproducible for a given seed.
+    batch_size : int, optional
+        Number of samples whose statistics are held in memory at once (default is 16).
+    max_workers : int, optional
+        Number of worker processes solving frontiers. ``1`` solves in the current process,
+        ``None`` uses all the cores.
+
+    Returns:
+    ---------------------
+    resampled_frontier_data : pd.DataFrame
+        DataFrame containing the averaged weights, return, standard deviation and Sharpe ratio
+        of each frontier portfolio, evaluated with the full-history statistics.
+    """
+
+    returns = df[stock_list].pct_change().iloc[1:].dropna()
+    returns_matrix = returns.to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+
+    weights_sum = np.zeros((number_of_portfolios, len(stock_list)))
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+    try:
+        for start in range(0, number_of_samples, batch_size):
+            # Draw the batch indices in order so results only depend on the seed
+            indices = generate_bootstrap_indices(len(returns_matrix), min(batch_size, number_of_samples - start), rng)
+            mean_returns, covs = get_bootstrap_statistics(returns_matrix, indices)
+
+            if executor is None:
+                results = map(get_frontier_weights, mean_returns, covs, repeat(number_of_portfolios))
+            else:
+                results = executor.map(get_frontier_weights, mean_returns, covs, repeat(number_of_portfolios))
+
+            for weights in results:
+                weights_sum += weights
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Average by rank and renormalize away solver round-off
+    weights = weights_sum / number_of_samples
+    weights = weights / weights.sum(axis=1, keepdims=True)
+
+    # Evaluate the averaged portfolios with the full-history statistics
+    mean_return = returns_matrix.mean(axis=0)
+    cov = np.cov(returns_matrix, rowvar=False)
+    performance = np.array([get_portfolio_performance(w, mean_return, cov) for w in weights])
+
+    resampled_frontier_data = pd.DataFrame(weights, columns=stock_list)
+    resampled_frontier_data['Return'] = performance[:, 0]
+    resampled_frontier_data['Std'] = performance[:, 1]
+    resampled_frontier_data['Sharpe Ratio'] = (performance[:, 0] - risk_free_rate) / performance[:, 1]
+
+    return resampled_frontier_data
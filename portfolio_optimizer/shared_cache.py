@@ -0,0 +1,210 @@
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+
+
+def _user_suffix():
+    # Other users cannot guess-and-create the cache directory of this user first
+    if hasattr(os, 'getuid'):
+        return str(os.getuid())
+    import getpass
+    return getpass.getuser()
+
+
+# The cache lives on disk so that every worker process of the server shares it. Its
+# entries are pickles, so it must be private: the directory is created with mode 0o700
+# and is only used when it belongs to the current user and nobody else can write to it.
+# Set PORTFOLIO_CACHE_DIR to an empty string to disable it.
+CACHE_DIR = os.environ.get('PORTFOLIO_CACHE_DIR', os.path.join(tempfile.gettempdir(),
+                                                               'portfolio_optimizer_cache-' + _user_suffix()))
+CACHE_TTL = float(os.environ.get('PORTFOLIO_CACHE_TTL', 12 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get('PORTFOLIO_CACHE_MAX_BYTES', 512 * 2**20))
+
+# Check the size of the cache every PRUNE_EVERY writes
+PRUNE_EVERY = 50
+_writes = 0
+_writes_lock = threading.Lock()
+
+# Cache directory that passed the _private_directory checks
+_verified_dir = None
+
+
+
+def cache_key(*parts):
+    """
+    Hash the parts of a cache key into a file name.
+
+    Parameters:
+    ---------------------
+    parts : tuple
+        Values identifying the cached result, their repr must be stable (str, numbers, tuples, None...).
+
+    Returns:
+    ---------------------
+    key : str
+        Hex digest of the parts.
+    """
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def cache_enabled():
+    """
+    Whether the shared cache is used, it is disabled by setting PORTFOLIO_CACHE_DIR to an empty string.
+    """
+    return bool(CACHE_DIR)
+
+
+def _path(namespace, key):
+    return os.path.join(CACHE_DIR, namespace, key + '.pickle')
+
+
+def _is_private(path):
+    # A real directory (not a link) owned by this user, that only this user can write to
+    try:
+        status = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(status.st_mode) or status.st_mode & 0o022:
+        return False
+    return not hasattr(os, 'getuid') or status.st_uid == os.getuid()
+
+
+def _private_directory(namespace=None):
+    """
+    Create the cache directory (and a namespace directory) with mode 0o700 and check that it is private.
+
+    Returns:
+    ---------------------
+    usable : bool
+        False when the cache is disabled or a directory is not private, the cache is then not used.
+    """
+    global _verified_dir
+    if not CACHE_DIR:
+        return False
+
+    if _verified_dir != CACHE_DIR:
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        except OSError:
+            return False
+        if not _is_private(CACHE_DIR):
+            return False
+        _verified_dir = CACHE_DIR
+
+    if namespace is None:
+        return True
+
+    directory = os.path.join(CACHE_DIR, namespace)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    except OSError:
+        return False
+    return _is_private(directory)
+
+
+def get_cached(namespace, key):
+    """
+    Read a value from the shared cache.
+
+    Parameters:
+    ---------------------
+    namespace : str
+        Kind of cached value, e.g. 'prices'.
+    key : str
+        Key from cache_key.
+
+    Returns:
+    ---------------------
+    value : object
+        The cached value, or None when it is missing, expired, unreadable or the cache is disabled.
+    """
+    if not _private_directory(namespace):
+        return None
+
+    path = _path(namespace, key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        # A truncated entry or one written by another version of the code is a miss
+        return None
+
+
+def set_cached(namespace, key, value):
+    """
+    Write a value to the shared cache.
+
+    The value is written to a temporary file that is then renamed, so concurrent
+    readers in other processes never see a partial file.
+
+    Parameters:
+    ---------------------
+    namespace : str
+        Kind of cached value, e.g. 'prices'.
+    key : str
+        Key from cache_key.
+    value : object
+        Picklable value.
+    """
+    global _writes
+    if not _private_directory(namespace):
+        return
+
+    directory = os.path.join(CACHE_DIR, namespace)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, _path(namespace, key))
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        return
+
+    with _writes_lock:
+        _writes += 1
+        prune = _writes % PRUNE_EVERY == 0
+    if prune:
+        prune_cache()
+
+
+def prune_cache():
+    """
+    Delete the expired entries, then the oldest ones until the cache fits in CACHE_MAX_BYTES.
+    """
+    if not _private_directory():
+        return
+
+    now = time.time()
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            if now - status.st_mtime > CACHE_TTL:
+                _remove(path)
+            else:
+                entries.append((status.st_mtime, status.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        _remove(path)
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
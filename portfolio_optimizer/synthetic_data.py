@@ -0,0 +1,71 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+
+
+def synthetic_prices(tickers, start_date=None, end_date=None, number_of_days=None, seed=0):
+    """
+    Generate offline adjusted close prices shaped like the output of get_returns_df.
+
+    Daily returns follow a one factor model with fat tailed (Student t) shocks. The
+    parameters and the shocks of each ticker are seeded from its symbol, so a ticker
+    has the same history whatever basket it is requested with.
+
+    Parameters:
+    ---------------------
+    tickers : list
+        List of stock symbols.
+    start_date : str, optional
+        Start date in the format (YYYY-MM-DD), defaults to 2020-01-01.
+    end_date : str, optional
+        End date in the format (YYYY-MM-DD), used when number_of_days is not given.
+    number_of_days : int, optional
+        Number of business days, defaults to the business days between the two dates.
+    seed : int, optional
+        Seed of the market factor (default is 0).
+
+    Returns:
+    ---------------------
+    df : pandas.DataFrame
+        Prices with business dates as the index and the sorted symbols as columns.
+    """
+
+    start_date = start_date or '2020-01-01'
+    if number_of_days is None:
+        dates = pd.bdate_range(start_date, end_date or pd.Timestamp.today().normalize(), inclusive='left')
+    else:
+        dates = pd.bdate_range(start_date, periods=number_of_days)
+
+    tickers = sorted(set(tickers))
+    market = np.random.default_rng(seed).standard_t(4, size=len(dates)) * 0.008
+
+    returns = np.empty((len(dates), len(tickers)))
+    for i, ticker in enumerate(tickers):
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+        beta = rng.uniform(0.5, 1.5)
+        drift = rng.uniform(-0.0002, 0.001)
+        volatility = rng.uniform(0.008, 0.025)
+        returns[:, i] = drift + beta * market + rng.standard_t(4, size=len(dates)) * volatility / np.sqrt(2)
+
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    df = pd.DataFrame(prices, index=pd.DatetimeIndex(dates, name='Date'), columns=tickers)
+
+    return df
+
+
+def synthetic_tickers(number_of_tickers):
+    """
+    Make a list of placeholder stock symbols.
+
+    Parameters:
+    ---------------------
+    number_of_tickers : int
+        Number of symbols.
+
+    Returns:
+    ---------------------
+    tickers : list
+        Symbols 'S0000', 'S0001', ...
+    """
+    return ['S{:04d}'.format(i) for i in range(number_of_tickers)]
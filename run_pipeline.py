@@ -0,0 +1,174 @@
+"""
+Headless batch runner of the portfolio optimization pipeline.
+
+Runs the same steps as the Calculate button of the app (statistics, efficient frontier,
+random portfolios and optimal points) for every request of a JSON Lines file, without
+building any figure, and writes the results as Parquet files:
+
+    <output>/<request id>/statistics.parquet
+    <output>/<request id>/covariance.parquet
+    <output>/<request id>/efficient_frontier.parquet
+    <output>/<request id>/random_portfolios.parquet
+    <output>/<request id>/optimal_points.parquet
+
+Each line of the request file is a JSON object such as
+
+    {"id": "tech", "tickers": ["AAPL", "MSFT", "NVDA"], "start_date": "2021-01-01", "end_date": "2023-01-01"}
+
+The id names the output directory, so it may only contain letters, digits, '.', '_'
+and '-', and may not start with '.'.
+
+Requests whose output directory already exists are skipped, so an interrupted run is
+resumed by running the same command again.
+
+    python run_pipeline.py requests.jsonl --output results --processes 4
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
+
+
+# Request ids are directory names under the output directory
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9._-]*')
+
+
+
+def load_requests(request_file):
+    """
+    Read the requests of a JSON Lines file.
+
+    Parameters:
+    ---------------------
+    request_file : str
+        Path of the request file.
+
+    Returns:
+    ---------------------
+    requests : list
+        List of request dicts, each with an 'id'. Requests without an id get one
+        derived from their content.
+
+    Raises:
+    ---------------------
+    ValueError
+        If an id is not a valid directory name (see REQUEST_ID_PATTERN).
+    """
+    requests = []
+    with open(request_file) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            if 'id' not in request:
+                request['id'] = hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()[:12]
+            # Ids such as '../x' or '/tmp/x' would write outside of the output directory
+            if not REQUEST_ID_PATTERN.fullmatch(str(request['id'])):
+                raise ValueError('Invalid request id {!r} on line {} of {}'.format(request['id'], line_number, request_file))
+            requests.append(request)
+    return requests
+
+
+def run_request(request, output_dir, number_of_frontier_portfolios, number_of_random_portfolios):
+    """
+    Run the pipeline for one request and write its Parquet files.
+
+    The files are written to a temporary directory which is renamed once complete,
+    so a request directory only exists for a finished request.
+
+    Returns:
+    ---------------------
+    outcome : tuple
+        The request id, the duration in seconds and the error message (None on success).
+    """
+    import numpy as np
+    import pandas as pd
+    from portfolio_optimizer.pipeline import run_optimization_pipeline
+
+    start = time.perf_counter()
+    final_dir = os.path.join(output_dir, str(request['id']))
+    temporary_dir = os.path.join(output_dir, '.{}.tmp'.format(request['id']))
+
+    try:
+        if 'seed' in request:
+            np.random.seed(request['seed'])
+
+        results = run_optimization_pipeline(
+            list(request['tickers']), request.get('start_date'), request.get('end_date'),
+            number_of_frontier_portfolios=number_of_frontier_portfolios,
+            number_of_random_portfolios=number_of_random_portfolios,
+            use_cache=False,
+        )
+
+        statistics = pd.DataFrame({
+            'Mean Return': results['mean_return'],
+            'Std': results['std'],
+            'Annualized Return': results['annualized_return'],
+            'Annualized Risk': results['annualized_risk'],
+        })
+
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        os.makedirs(temporary_dir)
+        statistics.to_parquet(os.path.join(temporary_dir, 'statistics.parquet'))
+        results['cov'].to_parquet(os.path.join(temporary_dir, 'covariance.parquet'))
+        results['efficient_frontier_data'].astype(float).to_parquet(os.path.join(temporary_dir, 'efficient_frontier.parquet'))
+        results['random_portfolios'].astype(float).to_parquet(os.path.join(temporary_dir, 'random_portfolios.parquet'))
+        results['optimal_points'].to_parquet(os.path.join(temporary_dir, 'optimal_points.parquet'))
+        with open(os.path.join(temporary_dir, 'request.json'), 'w') as file:
+            json.dump(request, file)
+
+        os.replace(temporary_dir, final_dir)
+        error = None
+    except Exception as exception:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        error = '{}: {}'.format(type(exception).__name__, exception)
+
+    return request['id'], time.perf_counter() - start, error
+
+
+def _run_request(args):
+    return run_request(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('request_file', help='JSON Lines file with one request per line')
+    parser.add_argument('--output', default='pipeline_results', help='output directory (default: pipeline_results)')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes (default: all cores)')
+    parser.add_argument('--frontier-portfolios', type=int, default=500)
+    parser.add_argument('--random-portfolios', type=int, default=2000)
+    args = parser.parse_args()
+
+    requests = load_requests(args.request_file)
+    os.makedirs(args.output, exist_ok=True)
+
+    # Resume: skip the requests that already have results
+    pending = [request for request in requests
+               if not os.path.isdir(os.path.join(args.output, str(request['id'])))]
+    skipped = len(requests) - len(pending)
+    if skipped:
+        print('Skipping {} finished request(s)'.format(skipped), file=sys.stderr)
+
+    tasks = [(request, args.output, args.frontier_portfolios, args.random_portfolios) for request in pending]
+    failed = 0
+    start = time.perf_counter()
+
+    with multiprocessing.Pool(args.processes) as pool:
+        for done, (request_id, duration, error) in enumerate(pool.imap_unordered(_run_request, tasks), start=1):
+            status = 'failed ({})'.format(error) if error else 'done'
+            print('[{}/{}] {} {} in {:.1f}s'.format(done, len(tasks), request_id, status, duration), file=sys.stderr)
+            failed += error is not None
+
+    print('Finished {} request(s) in {:.1f}s, {} failed'.format(len(tasks), time.perf_counter() - start, failed),
+          file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
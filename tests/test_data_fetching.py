@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from portfolio_optimizer.data_fetching import get_daily_returns
+
+
+
+def prices_with_gaps():
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(50, 3)), axis=0)),
+                          columns=['A', 'B', 'C'], index=pd.bdate_range('2021-01-01', periods=50))
+    prices.iloc[0, 1] = np.nan
+    prices.iloc[9:13, 2] = np.nan
+    return prices
+
+
+def test_float32_returns_match_float64_returns_across_chunks():
+    prices = prices_with_gaps()
+
+    returns = get_daily_returns(prices, dtype='float32', chunk_size=10)
+
+    expected = prices.ffill().pct_change()
+    assert (returns.dtypes == np.float32).all()
+    pd.testing.assert_index_equal(returns.index, prices.index)
+    np.testing.assert_allclose(returns.to_numpy(), expected.to_numpy(), rtol=1e-6, atol=1e-7)
+
+
+def test_float32_returns_from_float32_prices():
+    prices = prices_with_gaps().astype('float32')
+
+    returns = get_daily_returns(prices, dtype='float32', chunk_size=7)
+
+    expected = prices.astype(float).ffill().pct_change()
+    np.testing.assert_allclose(returns.to_numpy(), expected.to_numpy(), rtol=1e-5, atol=1e-6)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from portfolio_optimizer.frontier_index import build_frontier_index, get_tangency_portfolios
+
+
+
+def collapsed_frontier():
+    # Six distinct portfolios, then the targets above the best asset return all land on the
+    # maximum return portfolio up to solver noise, as with np.linspace(min_risk_return, 1, n)
+    stds = [0.10, 0.12, 0.15, 0.19, 0.24, 0.30]
+    returns = [0.05, 0.07, 0.09, 0.11, 0.13, 0.15]
+    weights = [[1 - t, t] for t in np.linspace(0, 1, 6)]
+    rng = np.random.default_rng(0)
+    for _ in range(15):
+        stds.append(0.30 + rng.uniform(-1e-9, 1e-9))
+        returns.append(0.15 + rng.uniform(-1e-9, 1e-9))
+        weights.append([0., 1.])
+    frontier = pd.DataFrame(weights, columns=['A', 'B'])
+    frontier['Return'], frontier['Std'] = returns, stds
+    frontier['Sharpe Ratio'] = frontier['Return'] / frontier['Std']
+    return frontier
+
+
+def test_collapsed_tail_is_indexed_once():
+    frontier_index = build_frontier_index(collapsed_frontier(), ['A', 'B'])
+
+    assert len(frontier_index['Std']) == 6
+    assert np.all(np.diff(frontier_index['Std']) > 0)
+    assert np.all(np.diff(frontier_index['Return']) > 0)
+
+
+def test_failed_solves_are_skipped():
+    frontier = collapsed_frontier()
+    frontier.loc[2, ['Return', 'Std']] = np.nan
+
+    frontier_index = build_frontier_index(frontier, ['A', 'B'])
+
+    assert len(frontier_index['Std']) == 5
+
+
+def test_tangency_of_collapsed_frontier():
+    frontier_index = build_frontier_index(collapsed_frontier(), ['A', 'B'])
+
+    tangency = get_tangency_portfolios(frontier_index, [0.0, 0.04])
+
+    sharpe_ratios = np.asarray(frontier_index['Return']) / np.asarray(frontier_index['Std'])
+    assert tangency['Std'][0] == frontier_index['Std'][int(np.argmax(sharpe_ratios))]
+    assert tangency['Std'][1] >= tangency['Std'][0]
@@ -0,0 +1,16 @@
+import numpy as np
+from portfolio_optimizer.resampled_frontier import generate_bootstrap_indices, get_bootstrap_statistics
+
+
+
+def test_bootstrap_statistics_match_gathered_samples():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.001, 0.02, size=(250, 6))
+    indices = generate_bootstrap_indices(len(returns), 4, rng)
+
+    mean_returns, covs = get_bootstrap_statistics(returns, indices)
+
+    for i, sample_indices in enumerate(indices):
+        sample = returns[sample_indices]
+        np.testing.assert_allclose(mean_returns[i], sample.mean(axis=0))
+        np.testing.assert_allclose(covs[i], np.cov(sample, rowvar=False), atol=1e-12)